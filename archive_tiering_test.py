@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+# Import the backend app module directly - merging the tiers needs no database
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+import server
+
+class FakeCursor:
+    """Async iterator over reports already in REPORT_SORT order"""
+
+    def __init__(self, reports):
+        self.reports = list(reports)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.reports:
+            raise StopAsyncIteration
+        return self.reports.pop(0)
+
+def report(report_id, minutes, details="Original"):
+    return {
+        "id": report_id,
+        "submitted_at": datetime(2025, 1, 1) - timedelta(minutes=minutes),
+        "tasks": [{"details": details, "status": "WIP"}]
+    }
+
+class ArchiveTieringTest(unittest.IsolatedAsyncioTestCase):
+    async def merged(self, *tiers):
+        return [item async for item in server.merge_report_streams([FakeCursor(tier) for tier in tiers])]
+
+    async def test_01_tiers_merge_in_sort_order(self):
+        """Test hot and archived reports interleave newest first"""
+        hot = [report("a", 0), report("c", 20)]
+        archive = [report("b", 10), report("d", 30)]
+        merged = await self.merged(hot, archive)
+        self.assertEqual([item["id"] for item in merged], ["a", "b", "c", "d"])
+
+    async def test_02_report_in_both_tiers_is_returned_once(self):
+        """Test a report edited while being archived is returned once, from the hot tier"""
+        hot = [report("a", 0), report("b", 10, "Edited after the copy")]
+        archive = [report("b", 10), report("c", 20)]
+        merged = await self.merged(hot, archive)
+        self.assertEqual([item["id"] for item in merged], ["a", "b", "c"])
+        self.assertEqual(merged[1]["tasks"][0]["details"], "Edited after the copy")
+
+    async def test_03_distinct_reports_with_equal_timestamps_are_kept(self):
+        """Test only copies of one report are dropped, not other reports submitted at the same time"""
+        hot = [report("a", 5), report("b", 5)]
+        archive = [report("c", 5), report("a", 5)]
+        merged = await self.merged(hot, archive)
+        self.assertEqual(sorted(item["id"] for item in merged), ["a", "b", "c"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
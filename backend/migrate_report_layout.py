@@ -0,0 +1,26 @@
+"""Copy work reports between the per-report and per-team-day bucket layouts.
+
+    python migrate_report_layout.py team_buckets
+    python migrate_report_layout.py documents --drop-source
+
+Run it, switch REPORT_STORAGE to the target layout, then run it once more to
+pick up reports written in between. --drop-source removes the old layout.
+"""
+import argparse
+import asyncio
+
+import server
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("target", choices=list(server.REPORT_LAYOUTS))
+    parser.add_argument("--drop-source", action="store_true", help="drop the source layout's collections afterwards")
+    args = parser.parse_args()
+    
+    written = await server.migrate_report_layout(args.target, drop_source=args.drop_source)
+    for tier, count in written.items():
+        print(f"{tier}: {count} document(s) written to {server.report_layout(args.target)[tier]}")
+    server.client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""Production server for running the API outside Vercel.
+
+    python serve.py
+
+Runs gunicorn with uvicorn workers (uvloop + httptools), one per CPU core
+unless WEB_CONCURRENCY is set, with the app preloaded in the master process.
+Without gunicorn it falls back to uvicorn's own process manager.
+
+On SIGTERM each worker first reports 503 on /api/health/ready for
+DRAIN_SECONDS so load balancers stop routing to it, then stops accepting
+connections and lets in-flight requests finish within GRACEFUL_TIMEOUT.
+A second SIGTERM skips the drain delay.
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+# gunicorn is optional - uvicorn alone can still run several workers
+try:
+    from gunicorn.app.base import BaseApplication
+    from gunicorn.arbiter import Arbiter
+    from uvicorn.workers import UvicornWorker
+except ImportError:
+    BaseApplication = None
+    UvicornWorker = None
+
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8001"))
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+DRAIN_SECONDS = float(os.environ.get("DRAIN_SECONDS", "5"))
+GRACEFUL_TIMEOUT = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+KEEPALIVE_SECONDS = 5
+
+class DrainingServer(uvicorn.Server):
+    """Uvicorn server that reports not-ready for DRAIN_SECONDS before shutting down"""
+
+    def handle_exit(self, sig, frame):
+        import server
+        if self.should_exit or server.is_draining() or DRAIN_SECONDS <= 0:
+            return super().handle_exit(sig, frame)
+        server.begin_drain()
+        asyncio.get_event_loop().call_later(DRAIN_SECONDS, super().handle_exit, sig, frame)
+
+class DrainingMultiprocess(Multiprocess):
+    def shutdown(self):
+        # Signal every worker before waiting on any, so they drain in parallel
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+
+if UvicornWorker is not None:
+    class DrainingUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "timeout_graceful_shutdown": GRACEFUL_TIMEOUT}
+
+        async def _serve(self):
+            self.config.app = self.wsgi
+            server = DrainingServer(config=self.config)
+            self._install_sigquit_handler()
+            await server.serve(sockets=self.sockets)
+            if not server.started:
+                sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+    class ProductionApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            import server
+            return server.app
+
+def run_gunicorn():
+    ProductionApplication({
+        "bind": f"{HOST}:{PORT}",
+        "workers": WORKERS,
+        "worker_class": DrainingUvicornWorker,
+        "preload_app": True,
+        "keepalive": KEEPALIVE_SECONDS,
+        # Drain delay plus in-flight requests before the master kills a worker
+        "graceful_timeout": int(DRAIN_SECONDS) + GRACEFUL_TIMEOUT,
+        "accesslog": "-",
+    }).run()
+
+def run_uvicorn():
+    config = uvicorn.Config(
+        "server:app",
+        host=HOST,
+        port=PORT,
+        workers=WORKERS,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+    server = DrainingServer(config)
+    if WORKERS > 1:
+        DrainingMultiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if BaseApplication is not None:
+        run_gunicorn()
+    else:
+        run_uvicorn()
@@ -1,23 +1,66 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, status, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+import pymongo
+from pymongo import ASCENDING, DESCENDING, DeleteOne, ReplaceOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.collation import Collation
+from bson import json_util
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from pymongo.read_preferences import Primary, SecondaryPreferred
+from pymongo.read_concern import ReadConcern
 import os
 import logging
 from pathlib import Path
+from urllib.parse import urlsplit
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+import time
+import threading
 import pytz
 import jwt
 import hashlib
 from passlib.context import CryptContext
 from io import StringIO
-from fastapi.responses import StreamingResponse
+from collections import OrderedDict, deque
+import json
+import asyncio
+import zlib
+import zipfile
+from functools import lru_cache
+from xml.sax.saxutils import escape as xml_escape
+import math
+import re
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from mangum import Mangum
+
+# Optional columnar export support
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Optional Brotli response compression
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Optional shared cache tier
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
 from contextlib import asynccontextmanager
+from contextvars import Context, ContextVar
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -25,35 +68,245 @@ load_dotenv(ROOT_DIR / '.env')
 # MongoDB connection with optimized settings for Vercel serverless
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
 
+MONGO_MAX_POOL_SIZE = 10
+
+# Driver monitoring - connection pool and server heartbeat events feed the
+# health endpoints, so reporting pool usage and latency costs no round trip
+class DriverMonitor(monitoring.ConnectionPoolListener, monitoring.ServerHeartbeatListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool = {"open": 0, "in_use": 0, "created": 0, "closed": 0, "checkout_failures": 0, "clears": 0}
+        self.heartbeat = {"latency_ms": None, "failures": 0, "observed_at": None}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, delta in deltas.items():
+                self.pool[key] += delta
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count(clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count(open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count(open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._count(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._count(in_use=1)
+
+    def connection_checked_in(self, event):
+        self._count(in_use=-1)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        # Awaited (streaming) heartbeats measure the wait, not the round trip
+        if not getattr(event, "awaited", False):
+            self.heartbeat["latency_ms"] = round(event.duration * 1000, 2)
+            self.heartbeat["observed_at"] = datetime.now(timezone.utc)
+
+    def failed(self, event):
+        self.heartbeat["failures"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            pool = {**self.pool, "max_size": MONGO_MAX_POOL_SIZE}
+        return {"pool": pool, "heartbeat": dict(self.heartbeat)}
+
+driver_monitor = DriverMonitor()
+
+# Query time budgets - read requests run under a per-endpoint deadline
+# (pymongo.timeout), so every find and aggregate they issue carries maxTimeMS
+# and a slow scan is cut off instead of holding a worker for socketTimeoutMS.
+# Consecutive timeouts open the circuit breaker: while it is open, budgeted
+# requests fail fast and cached reads fall back to their last result.
+QUERY_BUDGETS_MS = {
+    name: int(os.environ.get(f"QUERY_BUDGET_MS_{name.upper()}", budget))
+    for name, budget in {
+        "reference": 1000,
+        "attendance": 2000,
+        "work_reports": 5000,
+        "batch": 5000,
+        "export": 300000,
+        "default": 5000,
+    }.items()
+}
+# Streamed responses outlive any whole-request deadline, which would cut the body
+# off after the 200 was sent. Their cursors carry maxTimeMS instead - it counts
+# server processing time, not time spent waiting on a slow client - and their
+# timeouts are kept out of the breaker.
+STREAMING_BUDGETS = {"export"}
+QUERY_BREAKER_THRESHOLD = int(os.environ.get("QUERY_BREAKER_THRESHOLD", "5"))
+QUERY_BREAKER_COOLDOWN_SECONDS = float(os.environ.get("QUERY_BREAKER_COOLDOWN_SECONDS", "10"))
+MAX_TIME_MS_EXPIRED = 50
+CLIENT_TIMEOUT_ERRORS = {"NetworkTimeout", "ExecutionTimeout"}
+
+# Budget of the current request - Motor copies the context into its executor
+# threads, so command listeners see it too
+current_query_budget: ContextVar[Optional[str]] = ContextVar("current_query_budget", default=None)
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, cooldown: float):
+        self._lock = threading.Lock()
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_timeouts = 0
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+        self.stats = {"opened": 0, "failed_fast": 0}
+
+    def allow(self) -> bool:
+        """Whether a query may go to MongoDB; half-open lets one probe through per cooldown"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probe_at = None
+            if self.state == "half_open" and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+                self._probe_at = now
+                return True
+            self.stats["failed_fast"] += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self.consecutive_timeouts = 0
+            if self.state == "half_open":
+                self.state = "closed"
+                logging.info("Query circuit breaker closed")
+
+    def failure(self):
+        with self._lock:
+            self.consecutive_timeouts += 1
+            if self.state == "half_open" or (self.state == "closed" and self.consecutive_timeouts >= self.threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self.stats["opened"] += 1
+                logging.warning(f"Query circuit breaker opened after {self.consecutive_timeouts} consecutive timeouts")
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.cooldown - (time.monotonic() - self._opened_at)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_timeouts": self.consecutive_timeouts,
+                "threshold": self.threshold,
+                "cooldown_seconds": self.cooldown,
+                **self.stats,
+            }
+
+query_breaker = CircuitBreaker(QUERY_BREAKER_THRESHOLD, QUERY_BREAKER_COOLDOWN_SECONDS)
+
+def is_query_timeout(failure: Dict[str, Any]) -> bool:
+    """Whether a failed command hit maxTimeMS on the server or the deadline in the driver"""
+    return failure.get("code") == MAX_TIME_MS_EXPIRED or failure.get("errtype") in CLIENT_TIMEOUT_ERRORS
+
+class QueryBudgetMonitor(monitoring.CommandListener):
+    """Counts budgeted requests and overruns, and feeds command outcomes to the breaker"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.budgets = {name: {"budget_ms": budget, "requests": 0, "overruns": 0} for name, budget in QUERY_BUDGETS_MS.items()}
+
+    def request(self, budget: str):
+        with self._lock:
+            self.budgets[budget]["requests"] += 1
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        budget = current_query_budget.get()
+        if budget is not None and budget not in STREAMING_BUDGETS:
+            query_breaker.success()
+
+    def failed(self, event):
+        budget = current_query_budget.get()
+        if budget is None or not is_query_timeout(event.failure):
+            return
+        with self._lock:
+            self.budgets[budget]["overruns"] += 1
+        if budget not in STREAMING_BUDGETS:
+            query_breaker.failure()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            budgets = {name: dict(stats) for name, stats in self.budgets.items()}
+        return {"budgets": budgets, "breaker": query_breaker.snapshot()}
+
+query_budget_monitor = QueryBudgetMonitor()
+
+def breaker_open_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Database is not responding, please retry shortly",
+        headers={"Retry-After": str(query_breaker.retry_after())}
+    )
+
 # Singleton pattern for database connection (2025 best practice)
 class DatabaseConnection:
     _instance = None
     _client = None
     _db = None
+    _pid = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
         return cls._instance
     
+    @property
+    def forked(self) -> bool:
+        """Whether the client was created in another process (e.g. a preloading master)"""
+        return self._pid is not None and self._pid != os.getpid()
+    
     def get_client(self):
-        if self._client is None:
+        if self._client is None or self.forked:
+            # Motor clients are not fork-safe - each worker process opens its own
+            self._pid = os.getpid()
+            self._db = None
             # Optimized connection settings for serverless (2025 best practices)
             self._client = AsyncIOMotorClient(
                 mongo_url,
-                maxPoolSize=10,  # Optimize for serverless
+                maxPoolSize=MONGO_MAX_POOL_SIZE,  # Optimize for serverless
                 minPoolSize=1,   # Keep minimum connections
                 serverSelectionTimeoutMS=5000,  # Fast timeout
                 connectTimeoutMS=10000,  # Connection timeout
                 socketTimeoutMS=30000,   # Socket timeout
                 maxIdleTimeMS=45000,     # Close idle connections
                 retryWrites=True,        # Retry failed writes
-                w='majority'             # Write concern
+                w='majority',            # Write concern
+                connect=False,           # No monitor threads until first use, so a preloading master can fork safely
+                event_listeners=[driver_monitor, query_budget_monitor]
             )
         return self._client
     
     def get_database(self):
-        if self._db is None:
+        if self._db is None or self.forked:
             client = self.get_client()
             self._db = client[os.environ.get('DB_NAME', 'showtime_portal')]
         return self._db
@@ -63,6 +316,291 @@ db_connection = DatabaseConnection()
 client = db_connection.get_client()
 db = db_connection.get_database()
 
+def connect_database():
+    """Rebind client and db to this process's own connection after a fork"""
+    global client, db
+    if db_connection.forked:
+        client = db_connection.get_client()
+        db = db_connection.get_database()
+
+# Worker lifecycle - readiness is up once startup has finished and goes down as
+# soon as the worker starts draining; liveness only says the process is serving
+_lifecycle = {"ready": False, "draining": False}
+
+def begin_drain():
+    """Stop reporting ready so load balancers move traffic away before shutdown"""
+    _lifecycle["draining"] = True
+
+def is_draining() -> bool:
+    return _lifecycle["draining"]
+
+# Read preference routing - heavy read endpoints go to secondaries so that
+# login and report submission keep the primary to themselves.
+# MongoDB rejects maxStalenessSeconds below 90.
+ANALYTICS_MAX_STALENESS_SECONDS = max(90, int(os.environ.get("ANALYTICS_MAX_STALENESS_SECONDS", "120")))
+
+READ_PREFERENCES = {
+    "work_reports": SecondaryPreferred(max_staleness=ANALYTICS_MAX_STALENESS_SECONDS),
+    "export": SecondaryPreferred(max_staleness=ANALYTICS_MAX_STALENESS_SECONDS),
+    "attendance": SecondaryPreferred(max_staleness=ANALYTICS_MAX_STALENESS_SECONDS),
+    "analytics": SecondaryPreferred(max_staleness=ANALYTICS_MAX_STALENESS_SECONDS),
+}
+
+def read_collection(name: str, endpoint: str):
+    """Return a collection handle routed with the read preference of an endpoint"""
+    return db[name].with_options(read_preference=READ_PREFERENCES.get(endpoint, Primary()))
+
+# Causal consistency tokens (cluster time, operation time) of each user's last
+# write. Reads by the same user within the staleness window run in a causally
+# consistent session, so a secondary waits until it has the user's own writes.
+_causal_tokens: Dict[str, Any] = {}
+
+def remember_write(email: str, session) -> None:
+    """Record the token of a write so the user's next reads observe it"""
+    if session.cluster_time is None or session.operation_time is None:
+        # Standalone server, nothing to wait for
+        return
+    now = time.monotonic()
+    for key in [k for k, v in _causal_tokens.items() if v[2] < now]:
+        _causal_tokens.pop(key, None)
+    _causal_tokens[email] = (session.cluster_time, session.operation_time, now + ANALYTICS_MAX_STALENESS_SECONDS)
+
+@asynccontextmanager
+async def causal_session(email: str):
+    """Causally consistent session carrying the user's last write token.
+    
+    Write paths call remember_write before leaving the session; reads must not,
+    or every poll would keep the user on uncached majority reads.
+    """
+    async with await client.start_session(causal_consistency=True) as session:
+        token = _causal_tokens.get(email)
+        if token and token[2] >= time.monotonic():
+            session.advance_cluster_time(token[0])
+            session.advance_operation_time(token[1])
+        yield session
+
+def has_pending_write(email: str) -> bool:
+    token = _causal_tokens.get(email)
+    return token is not None and token[2] >= time.monotonic()
+
+def causal_read_collection(name: str, endpoint: str, email: str):
+    """Routed collection handle, upgraded to majority reads when the user has a pending write"""
+    collection = read_collection(name, endpoint)
+    if has_pending_write(email):
+        collection = collection.with_options(read_concern=ReadConcern("majority"))
+    return collection
+
+# Single-flight query layer - concurrent identical dashboard queries share one
+# in-flight MongoDB call, and results are reused for a short TTL
+QUERY_CACHE_TTL_SECONDS = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", "2"))
+QUERY_CACHE_SIZE = 256
+
+# Shared cache tier - with CACHE_REDIS_URL set, query results cached below are
+# also written to a Redis-protocol server, so a cold serverless instance starts
+# warm. Keys carry a version per collection and writes bump the version instead
+# of deleting keys; entries under old versions are never read again and expire.
+# Redis errors count as misses and back the tier off for a few seconds.
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "")
+CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "showtime")
+CACHE_VERSION_TTL_SECONDS = float(os.environ.get("CACHE_VERSION_TTL_SECONDS", "1"))  # how long a version read from Redis is trusted
+CACHE_REDIS_TIMEOUT_SECONDS = 0.25
+CACHE_REDIS_BACKOFF_SECONDS = 5
+
+class LRUCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: Any):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCache:
+    def __init__(self, url: str):
+        self.url = url
+        # RESP2 works with every Redis-protocol server, managed or self-hosted
+        self._client = aioredis.from_url(
+            url,
+            protocol=2,
+            socket_timeout=CACHE_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=CACHE_REDIS_TIMEOUT_SECONDS
+        )
+        self._down_until = 0.0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def key(self, *parts: str) -> str:
+        return ":".join((CACHE_KEY_PREFIX,) + parts)
+
+    async def _call(self, command: str, *args, **kwargs):
+        """Run a command, or return None while the server is failing"""
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return await getattr(self._client, command)(*args, **kwargs)
+        except Exception as e:
+            self.stats["errors"] += 1
+            self._down_until = time.monotonic() + CACHE_REDIS_BACKOFF_SECONDS
+            logging.warning(f"Shared cache {command} error: {str(e)}")
+            return None
+
+    async def get(self, key: str) -> Optional[tuple]:
+        """(value,) for a hit - a cached None is still a hit"""
+        data = await self._call("get", key)
+        if data is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return (json_util.loads(data)["value"],)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        if await self._call("set", key, json_util.dumps({"value": value}), px=max(1, int(ttl * 1000))):
+            self.stats["writes"] += 1
+
+    async def version(self, collection: str) -> Optional[int]:
+        version = await self._call("get", self.key("version", collection))
+        # None while Redis is failing, 0 for a collection that was never bumped
+        return None if version is None and time.monotonic() < self._down_until else int(version or 0)
+
+    async def bump(self, collection: str) -> Optional[int]:
+        return await self._call("incr", self.key("version", collection))
+
+    async def close(self):
+        await self._client.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "available": time.monotonic() >= self._down_until}
+
+shared_cache = RedisCache(CACHE_REDIS_URL) if CACHE_REDIS_URL and aioredis is not None else None
+if CACHE_REDIS_URL and aioredis is None:
+    logging.warning("CACHE_REDIS_URL is set but the redis package is not installed - using the in-process cache only")
+
+class CacheVersions:
+    def __init__(self):
+        self._versions: Dict[str, tuple] = {}  # collection -> (version, read at)
+
+    async def get(self, collection: str) -> int:
+        version, read_at = self._versions.get(collection, (0, float("-inf")))
+        if shared_cache is None or time.monotonic() - read_at < CACHE_VERSION_TTL_SECONDS:
+            return version
+        shared = await shared_cache.version(collection)
+        if shared is not None:
+            version = shared
+        self._versions[collection] = (version, time.monotonic())
+        return version
+
+    async def bump(self, collection: str) -> int:
+        """Move the collection to a new version, here and for every instance sharing Redis"""
+        version = self._versions.get(collection, (0, 0.0))[0] + 1
+        if shared_cache is not None:
+            version = await shared_cache.bump(collection) or version
+        self._versions[collection] = (version, time.monotonic())
+        return version
+
+    def snapshot(self) -> Dict[str, int]:
+        return {collection: version for collection, (version, _) in self._versions.items()}
+
+cache_versions = CacheVersions()
+
+class SingleFlight:
+    def __init__(
+        self,
+        name: str,
+        ttl: float = QUERY_CACHE_TTL_SECONDS,
+        max_entries: int = QUERY_CACHE_SIZE,
+        serve_stale: bool = False,
+        collection: Optional[str] = None
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Expired results are kept until evicted, and served when MongoDB times out
+        self.serve_stale = serve_stale
+        # Results read from this collection are versioned by it and shared through Redis
+        self.collection = collection
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._results = LRUCache(max_entries)  # key -> (expires, version, result)
+        self.stats = {"db_calls": 0, "hits": 0, "shared_hits": 0, "coalesced": 0, "stale": 0}
+
+    async def do(self, key: str, fetch):
+        """Return the cached or in-flight result for key, calling fetch() only if there is neither"""
+        version = await cache_versions.get(self.collection) if self.collection else 0
+        cached = self._results.get(key)
+        if cached is not None and cached[1] == version and cached[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return cached[2]
+        if self.serve_stale and not query_breaker.allow():
+            if cached is None:
+                raise breaker_open_error()
+            self.stats["stale"] += 1
+            return cached[2]
+        # A fetch started before a write is never joined by requests after it
+        flight = f"{version}:{key}"
+        task = self._inflight.get(flight)
+        if task is None:
+            # Run as its own task so a cancelled leader does not cancel the followers
+            task = asyncio.ensure_future(self._load(key, version, fetch))
+            self._inflight[flight] = task
+            task.add_done_callback(lambda done: self._finish(flight, key, version, done))
+        else:
+            self.stats["coalesced"] += 1
+        try:
+            return await asyncio.shield(task)
+        except PyMongoError as e:
+            if not (self.serve_stale and e.timeout and cached is not None):
+                raise
+            self.stats["stale"] += 1
+            return cached[2]
+
+    async def _load(self, key: str, version: int, fetch):
+        shared_key = None
+        if shared_cache is not None and self.collection and self.ttl > 0:
+            digest = hashlib.sha256(key.encode()).hexdigest()
+            shared_key = shared_cache.key(self.name, f"{self.collection}@{version}", digest)
+            found = await shared_cache.get(shared_key)
+            if found is not None:
+                self.stats["shared_hits"] += 1
+                return found[0]
+        self.stats["db_calls"] += 1
+        result = await fetch()
+        if shared_key is not None:
+            await shared_cache.set(shared_key, result, self.ttl)
+        return result
+
+    def _finish(self, flight: str, key: str, version: int, task: asyncio.Task):
+        self._inflight.pop(flight, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.ttl > 0:
+            self._results.set(key, (time.monotonic() + self.ttl, version, task.result()))
+
+    def invalidate(self):
+        """Drop this instance's results - versioned caches bump their collection instead"""
+        self._results.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._inflight), "cached": len(self._results), "ttl_seconds": self.ttl}
+
+report_list_queries = SingleFlight("work_reports", collection="work_reports")
+attendance_queries = SingleFlight("attendance", serve_stale=True, collection="work_reports")
+
+async def invalidate_report_caches():
+    """Bump the report cache version - results cached under the old one are never read again"""
+    await cache_versions.bump("work_reports")
+
 # Department and team data with resource counts
 DEPARTMENT_DATA = {
     "Soul Centre": {
@@ -202,6 +740,9 @@ class UserCreate(BaseModel):
     department: str = ""
     team: str = ""
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class UserResponse(BaseModel):
     id: str
     name: str
@@ -227,6 +768,7 @@ class WorkReport(BaseModel):
     submitted_at: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Asia/Kolkata')))
     last_modified_at: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Asia/Kolkata')))
     last_modified_by: str = ""
+    revision: int = 1
 
 class WorkReportCreate(BaseModel):
     employee_name: str
@@ -239,11 +781,45 @@ class WorkReportCreate(BaseModel):
 class WorkReportUpdate(BaseModel):
     tasks: List[Task]
 
+class BulkReportSelection(BaseModel):
+    ids: Optional[List[str]] = None
+    department: Optional[str] = None
+    team: Optional[str] = None
+    manager: Optional[str] = None
+    from_date: Optional[str] = None
+    to_date: Optional[str] = None
+
+class BulkStatusUpdate(BulkReportSelection):
+    from_status: str
+    to_status: str
+
 # Security setup
 security = HTTPBearer()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-here")
-ALGORITHM = "HS256"
+# HS256 by default; RS256/EdDSA sign with JWT_PRIVATE_KEY so other services can
+# verify tokens locally with the public key published at /api/auth/jwks
+ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+
+def _load_signing_keys():
+    """Parse the signing and verification keys once instead of on every encode/decode"""
+    if ALGORITHM.startswith("HS"):
+        return SECRET_KEY, SECRET_KEY, None
+    from cryptography.hazmat.primitives import serialization
+    private_pem = os.environ.get("JWT_PRIVATE_KEY", "").replace("\\n", "\n").encode()
+    private_key = serialization.load_pem_private_key(private_pem, password=None)
+    public_key = private_key.public_key()
+    public_pem = public_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    key_id = hashlib.sha256(public_pem).hexdigest()[:16]
+    return private_key, public_key, key_id
+
+SIGNING_KEY, VERIFYING_KEY, KEY_ID = _load_signing_keys()
 
 # IST timezone
 IST = pytz.timezone('Asia/Kolkata')
@@ -255,15 +831,78 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def _encode_token(claims: dict, token_type: str, expires_delta: timedelta) -> str:
+    now = datetime.now(timezone.utc)
+    payload = {**claims, "type": token_type, "iat": now, "exp": now + expires_delta}
+    headers = {"kid": KEY_ID} if KEY_ID else None
+    return jwt.encode(payload, SIGNING_KEY, algorithm=ALGORITHM, headers=headers)
+
 def create_access_token(data: dict):
-    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+    return _encode_token(data, "access", timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+def create_refresh_token(data: dict):
+    return _encode_token(
+        {"sub": data["sub"], "jti": str(uuid.uuid4())},
+        "refresh",
+        timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+
+def user_token_claims(user: dict) -> dict:
+    """Claims embedded in access tokens so requests can be authenticated without a DB lookup"""
+    return {
+        "sub": user["email"],
+        "uid": user["id"],
+        "name": user["name"],
+        "role": user["role"],
+        "department": user.get("department", ""),
+        "team": user.get("team", ""),
+    }
 
-def verify_token(token: str):
+def issue_tokens(user: dict) -> dict:
+    claims = user_token_claims(user)
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+# Decoded payloads memoized by token hash until the token expires
+_token_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+def verify_token(token: str, token_type: str = "access"):
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _token_cache.get(cache_key)
+    if payload is not None:
+        if payload["exp"] <= time.time():
+            _token_cache.pop(cache_key, None)
+            return None
+        _token_cache.move_to_end(cache_key)
+        return payload if payload.get("type") == token_type else None
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = jwt.decode(
+            token,
+            VERIFYING_KEY,
+            algorithms=[ALGORITHM],
+            options={"require": ["exp", "sub"]}
+        )
     except jwt.PyJWTError:
         return None
+    if payload.get("type") != token_type:
+        return None
+    _token_cache[cache_key] = payload
+    if len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+    return payload
+
+def public_jwks() -> dict:
+    """JSON Web Key Set for local verification by other services"""
+    if KEY_ID is None:
+        return {"keys": []}
+    algorithm = jwt.algorithms.get_default_algorithms()[ALGORITHM]
+    jwk = json.loads(algorithm.to_jwk(VERIFYING_KEY))
+    jwk.update({"kid": KEY_ID, "alg": ALGORITHM, "use": "sig"})
+    return {"keys": [jwk]}
 
 # Helper function to convert MongoDB document to dict with proper ObjectId handling
 def convert_mongo_doc(doc):
@@ -278,7 +917,34 @@ def convert_mongo_doc(doc):
     
     return doc_dict
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# User lookups - email is matched case-insensitively through the collation of
+# the unique email index, and password_hash is only ever read by login
+EMAIL_COLLATION = Collation(locale="en", strength=2)
+EMAIL_INDEX = "email_ci_unique"
+USER_FIELDS = {"_id": 0, "id": 1, "name": 1, "email": 1, "role": 1, "department": 1, "team": 1}
+LOGIN_FIELDS = {**USER_FIELDS, "password_hash": 1}
+
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "60"))
+user_lookups = SingleFlight("users", ttl=USER_CACHE_TTL_SECONDS, max_entries=1000, collection="users")
+
+async def find_user(email: str, with_password: bool = False) -> Optional[Dict[str, Any]]:
+    async def fetch():
+        return await db.users.find_one(
+            {"email": email},
+            LOGIN_FIELDS if with_password else USER_FIELDS,
+            collation=EMAIL_COLLATION
+        )
+    
+    # Password hashes never go into the cache
+    if with_password:
+        return await fetch()
+    return await user_lookups.do(email.lower(), fetch)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), request: Request = None):
+    # Batch sub-requests reuse the user the batch request authenticated
+    if request is not None and "batch_user" in request.scope:
+        return request.scope["batch_user"]
+    
     token = credentials.credentials
     payload = verify_token(token)
     if payload is None:
@@ -288,8 +954,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Fast path - access tokens carry the user's claims
+    if "uid" in payload and "role" in payload:
+        return UserResponse(
+            id=payload["uid"],
+            name=payload["name"],
+            email=payload["sub"],
+            role=payload["role"],
+            department=payload.get("department", ""),
+            team=payload.get("team", "")
+        )
+    
     try:
-        user = await db.users.find_one({"email": payload.get("sub")})
+        user = await find_user(payload.get("sub"))
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -311,8 +988,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 async def init_database():
     try:
         # Check if users already exist
-        user_count = await db.users.count_documents({})
-        if user_count == 0:
+        if await db.users.find_one({}, {"_id": 1}) is None:
             # Insert predefined users
             users_to_insert = []
             for user_data in PREDEFINED_USERS:
@@ -327,36 +1003,443 @@ async def init_database():
                 users_to_insert.append(user.dict())
             
             await db.users.insert_many(users_to_insert)
+            await invalidate_user_caches()
             print("Database initialized with predefined users")
         else:
-            # Update existing users with department and team data where missing
-            for user_data in PREDEFINED_USERS:
-                existing_user = await db.users.find_one({"email": user_data["email"]})
-                if existing_user and not existing_user.get("department"):
-                    await db.users.update_one(
-                        {"email": user_data["email"]},
-                        {"$set": {
-                            "department": user_data.get("department", ""),
-                            "team": user_data.get("team", "")
-                        }}
-                    )
-                    print(f"Updated {user_data['name']} with department and team data")
+            # Update existing users with department and team data where missing, in one round trip
+            result = await db.users.bulk_write([
+                UpdateOne(
+                    {"email": user_data["email"], "department": {"$in": [None, ""]}},
+                    {"$set": {
+                        "department": user_data.get("department", ""),
+                        "team": user_data.get("team", "")
+                    }},
+                    collation=EMAIL_COLLATION
+                )
+                for user_data in PREDEFINED_USERS
+            ], ordered=False)
+            if result.modified_count:
+                # Only real changes bump the shared version, so cold starts keep the cache warm
+                await invalidate_user_caches()
+                print(f"Updated {result.modified_count} user(s) with department and team data")
     except Exception as e:
         print(f"Database initialization error: {str(e)}")
 
+# Organization index - manager, team and department relationships with O(1) lookups.
+# The source of truth is a single document in the org_index collection, seeded
+# from DEPARTMENT_DATA / MANAGER_RESOURCES and the users collection, so it can be
+# edited and reloaded without a redeploy.
+ORG_INDEX_ID = "current"
+
+def _name_tokens(name: str) -> set:
+    return {token for token in name.lower().replace(".", " ").split() if len(token) > 1}
+
+class OrgIndex:
+    def __init__(self, managers: List[Dict[str, Any]], version: int = 0):
+        self.managers = managers
+        self.version = version
+        self.departments: Dict[str, Dict[str, List[str]]] = {}
+        self.manager_resources: Dict[str, int] = {}
+        self.manager_to_team: Dict[str, Dict[str, str]] = {}
+        self.team_to_department: Dict[str, str] = {}
+        self.email_to_manager: Dict[str, str] = {}
+        self.manager_emails: Dict[str, List[str]] = {}
+        self.manager_names: Dict[str, List[str]] = {}
+        self.team_headcount: Dict[str, int] = {}
+        self.department_headcount: Dict[str, int] = {}
+        self._aliases: Dict[str, str] = {}
+
+        for entry in managers:
+            name = entry["name"]
+            department = entry["department"]
+            team = entry["team"]
+            resources = int(entry.get("resources", 0))
+            emails = list(entry.get("emails", []))
+
+            self.departments.setdefault(department, {}).setdefault(team, []).append(name)
+            self.manager_resources[name] = resources
+            self.manager_to_team[name] = {"department": department, "team": team}
+            self.team_to_department[team] = department
+            self.manager_emails[name] = emails
+            self.manager_names[name] = [name] + [a for a in entry.get("aliases", []) if a != name]
+            self.team_headcount[team] = self.team_headcount.get(team, 0) + resources
+            self.department_headcount[department] = self.department_headcount.get(department, 0) + resources
+
+            self._aliases[name.lower()] = name
+            for alias in entry.get("aliases", []):
+                self._aliases[alias.lower()] = name
+            for email in emails:
+                self.email_to_manager[email.lower()] = name
+
+    @classmethod
+    def from_seed(cls, users: List[Dict[str, Any]]) -> "OrgIndex":
+        """Build the index from the hand-maintained dicts, matching labels such as
+        "Atia" or "Madhunisha and Apoorva" to user accounts of the same team"""
+        managers = []
+        for department, teams in DEPARTMENT_DATA.items():
+            for team, names in teams.items():
+                team_users = [u for u in users if u.get("department") == department and u.get("team") == team]
+                for name in names:
+                    emails, aliases = [], []
+                    for part in name.split(" and "):
+                        part_tokens = _name_tokens(part)
+                        for user in team_users:
+                            if part_tokens & _name_tokens(user["name"]) and user["email"] not in emails:
+                                emails.append(user["email"])
+                                aliases.append(user["name"])
+                    managers.append({
+                        "name": name,
+                        "department": department,
+                        "team": team,
+                        "resources": MANAGER_RESOURCES.get(name, 0),
+                        "emails": emails,
+                        "aliases": aliases,
+                    })
+        return cls(managers)
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> "OrgIndex":
+        return cls(doc.get("managers", []), version=doc.get("version", 0))
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            "_id": ORG_INDEX_ID,
+            "version": self.version,
+            "managers": self.managers,
+            "built_at": datetime.now(IST),
+        }
+
+    def resolve_manager(self, name: str) -> Optional[str]:
+        """Map a manager label, full user name or email to the canonical manager label"""
+        if not name:
+            return None
+        key = name.lower()
+        return self._aliases.get(key) or self.email_to_manager.get(key)
+
+    def manager_aliases(self, name: str) -> List[str]:
+        """All names a report may carry in reporting_manager for the given manager"""
+        canonical = self.resolve_manager(name)
+        if canonical is None:
+            return [name]
+        return self.manager_names[canonical]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "departments": len(self.departments),
+            "teams": len(self.team_to_department),
+            "managers": len(self.manager_resources),
+            "mapped_emails": len(self.email_to_manager),
+            "total_resources": sum(self.manager_resources.values()),
+        }
+
+# Built from the seed dicts at import and replaced from MongoDB at startup
+org_index = OrgIndex.from_seed(PREDEFINED_USERS)
+
+async def load_org_index(rebuild: bool = False) -> OrgIndex:
+    """Load the org index from MongoDB, seeding it on first run or when rebuild is requested"""
+    global org_index
+    doc = None if rebuild else await db.org_index.find_one({"_id": ORG_INDEX_ID})
+    if doc is None:
+        users = await db.users.find(
+            {"role": "manager"},
+            {"_id": 0, "name": 1, "email": 1, "department": 1, "team": 1}
+        ).to_list(1000)
+        previous = await db.org_index.find_one({"_id": ORG_INDEX_ID}, {"version": 1})
+        index = OrgIndex.from_seed(users)
+        index.version = (previous or {}).get("version", 0) + 1
+        await db.org_index.replace_one({"_id": ORG_INDEX_ID}, index.to_document(), upsert=True)
+    else:
+        index = OrgIndex.from_document(doc)
+    org_index = index
+    return index
+
+# Manager directory - the projected manager list behind the frontend dropdowns,
+# cached per process and invalidated whenever users are added or backfilled
+MANAGER_DIRECTORY_TTL_SECONDS = float(os.environ.get("MANAGER_DIRECTORY_TTL_SECONDS", "300"))
+MANAGER_ROLE_INDEX = "role_name"
+MANAGER_GROUPINGS = ("department", "team")
+manager_directories = SingleFlight("managers", ttl=MANAGER_DIRECTORY_TTL_SECONDS, max_entries=1, serve_stale=True, collection="users")
+
+async def build_manager_directory() -> Dict[str, Any]:
+    """Every grouping of the manager list, built from one indexed, projected query"""
+    cursor = db.users.find(
+        {"role": "manager"},
+        {"_id": 0, "name": 1, "email": 1, "department": 1, "team": 1}
+    ).sort("name", ASCENDING)
+    if index_available("users", MANAGER_ROLE_INDEX):
+        cursor = cursor.hint(MANAGER_ROLE_INDEX)
+    managers = await cursor.to_list(1000)
+    
+    departments: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
+    teams: Dict[str, List[Dict[str, str]]] = {}
+    for manager in managers:
+        entry = {"name": manager["name"], "email": manager["email"]}
+        department = manager.get("department") or ""
+        team = manager.get("team") or ""
+        departments.setdefault(department, {}).setdefault(team, []).append(entry)
+        teams.setdefault(team, []).append(entry)
+    return {
+        "flat": {"managers": [{"name": m["name"], "email": m["email"]} for m in managers]},
+        "department": {"departments": departments},
+        "team": {"teams": teams},
+    }
+
+async def manager_directory() -> Dict[str, Any]:
+    return await manager_directories.do("directory", build_manager_directory)
+
+async def invalidate_user_caches():
+    """Bump the users cache version, dropping cached user lookups and manager directories"""
+    await cache_versions.bump("users")
+
+# One report per employee per day - resubmissions merge their tasks into it
+REPORT_UNIQUE_INDEX = "employee_date_unique"
+
+async def merge_duplicate_reports(collection=None):
+    """Fold same-day duplicate reports into the earliest one so the unique index can be built"""
+    collection = db.work_reports if collection is None else collection
+    duplicates = collection.aggregate([
+        {"$sort": {"submitted_at": 1}},
+        {"$group": {
+            "_id": {"employee_email": "$employee_email", "date": "$date"},
+            "ids": {"$push": "$id"},
+            "tasks": {"$push": "$tasks"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    async for group in duplicates:
+        keep_id, *drop_ids = group["ids"]
+        merged_tasks = [task for tasks in group["tasks"] for task in tasks]
+        await collection.update_one(
+            {"id": keep_id},
+            {"$set": {"tasks": merged_tasks}, "$currentDate": {"last_modified_at": True}}
+        )
+        await collection.delete_many({"id": {"$in": drop_ids}})
+        print(f"Merged {len(drop_ids)} duplicate report(s) for {group['_id']['employee_email']} on {group['_id']['date']}")
+
+# Delta sync - opaque change tokens are server timestamps; each sync re-reads a
+# short overlap window so writes that landed just behind the token are not missed.
+# Changes are read from the primary, so the overlap only has to cover clock skew
+# and in-flight writes; tokens from secondary reads also step back the staleness bound.
+SYNC_OVERLAP_SECONDS = int(os.environ.get("SYNC_OVERLAP_SECONDS", "10"))
+SYNC_PAGE_SIZE = 500
+SYNC_TOMBSTONE_TTL_DAYS = int(os.environ.get("SYNC_TOMBSTONE_TTL_DAYS", "30"))
+
+def _as_utc(moment: datetime) -> datetime:
+    # MongoDB returns naive UTC datetimes
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+def make_sync_token(moment: datetime) -> str:
+    return f"v1.{int(_as_utc(moment).timestamp() * 1000)}"
+
+def parse_sync_token(token: str) -> datetime:
+    version, _, millis = token.partition(".")
+    if version != "v1" or not millis.isdigit():
+        raise ValueError(f"Invalid sync token: {token}")
+    return datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+
+# Idempotency keys - a write sent with an Idempotency-Key header runs once per
+# (user, route, key); retries replay the stored response for IDEMPOTENCY_TTL_HOURS.
+# Duplicates arriving while the first is running wait on it: in process through
+# single-flight, across workers by polling the claim document.
+IDEMPOTENCY_TTL_HOURS = int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_LOCK_SECONDS = 60
+IDEMPOTENCY_WAIT_SECONDS = 10
+IDEMPOTENCY_POLL_SECONDS = 0.1
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+idempotent_requests = SingleFlight("idempotency", ttl=0)
+
+def request_fingerprint(payload: Any) -> str:
+    # Callers pass the request as sent (exclude_unset), so server-generated ids do not differ between retries
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def replay_idempotent(record: Dict[str, Any]):
+    if record["status_code"] >= 400:
+        raise HTTPException(status_code=record["status_code"], detail=record["response"])
+    return JSONResponse(
+        content=record["response"],
+        status_code=record["status_code"],
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+async def claim_idempotency_key(claim_id: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Claim the key for this request; returns None if claimed, else the completed record to replay"""
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        try:
+            await db.idempotency_keys.insert_one({
+                "_id": claim_id,
+                "fingerprint": fingerprint,
+                "state": "in_progress",
+                "created_at": datetime.now(timezone.utc),
+            })
+            return None
+        except DuplicateKeyError:
+            record = await db.idempotency_keys.find_one({"_id": claim_id})
+        if record is None:
+            # Expired or released between the insert and the read
+            continue
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request"
+            )
+        if record["state"] == "completed":
+            return record
+        # Take over a claim whose worker died mid-request
+        stale = datetime.now(timezone.utc) - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+        taken = await db.idempotency_keys.update_one(
+            {"_id": claim_id, "state": "in_progress", "created_at": {"$lt": stale}},
+            {"$set": {"created_at": datetime.now(timezone.utc)}}
+        )
+        if taken.modified_count:
+            return None
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+async def run_idempotent(scope: str, key: Optional[str], payload: Any, handler):
+    """Run handler() at most once per idempotency key, replaying its stored response otherwise"""
+    if key is None:
+        return await handler()
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+    claim_id = f"{scope}|{key}"
+    fingerprint = request_fingerprint(payload)
+    
+    async def execute():
+        record = await claim_idempotency_key(claim_id, fingerprint)
+        if record is not None:
+            return replay_idempotent(record)
+        try:
+            response = await handler()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                await db.idempotency_keys.delete_one({"_id": claim_id})
+                raise
+            status_code, content = e.status_code, e.detail
+        except BaseException:
+            # Not executed to completion - release the key so a retry runs it again
+            await db.idempotency_keys.delete_one({"_id": claim_id})
+            raise
+        else:
+            status_code, content = status.HTTP_200_OK, jsonable_encoder(response)
+        await db.idempotency_keys.update_one(
+            {"_id": claim_id},
+            {"$set": {"state": "completed", "status_code": status_code, "response": content}}
+        )
+        if status_code >= 400:
+            raise HTTPException(status_code=status_code, detail=content)
+        return response
+    
+    return await idempotent_requests.do(f"{claim_id}|{fingerprint}", execute)
+
+# Indexes used by the API, created idempotently at startup. Each index is built
+# on its own so one failure does not leave the rest missing, and query hints are
+# only sent for indexes seen on the collection - a hint naming a missing index
+# fails the whole query.
+_index_names: Dict[str, set] = {}
+
+async def create_index_logged(collection, keys, **kwargs) -> bool:
+    try:
+        await collection.create_index(keys, **kwargs)
+        return True
+    except Exception as e:
+        print(f"Index creation error on {collection.name} ({kwargs.get('name', keys)}): {str(e)}")
+        return False
+
+async def refresh_index_names(*names: str):
+    """Record which indexes exist, so hints are only sent for those"""
+    for name in names:
+        try:
+            _index_names[name] = set(await db[name].index_information())
+        except Exception as e:
+            print(f"Index listing error on {name}: {str(e)}")
+            _index_names[name] = set()
+
+def index_available(collection_name: str, index: str) -> bool:
+    return index in _index_names.get(collection_name, ())
+
+async def ensure_indexes():
+    # Emails differing only in case must be merged by hand before this index can be
+    # built; until then signup falls back to checking for the email before inserting
+    await create_index_logged(db.users, "email", unique=True, collation=EMAIL_COLLATION, name=EMAIL_INDEX)
+    await create_index_logged(db.users, [("role", ASCENDING), ("name", ASCENDING)], name=MANAGER_ROLE_INDEX)
+    await create_index_logged(db.work_reports, "id", unique=True)
+    try:
+        if REPORT_UNIQUE_INDEX not in await db.work_reports.index_information():
+            await merge_duplicate_reports()
+            await db.work_reports.create_index(
+                [("employee_email", ASCENDING), ("date", ASCENDING)],
+                unique=True,
+                name=REPORT_UNIQUE_INDEX
+            )
+    except Exception as e:
+        print(f"Report uniqueness index error: {str(e)}")
+    await create_index_logged(db.work_reports, "last_modified_at")
+    for name, keys in REPORT_QUERY_INDEXES[1:] + [REPORT_SORT_INDEX]:
+        await create_index_logged(db.work_reports, keys, name=name)
+    await ensure_report_layout(REPORT_STORAGE)
+    await create_index_logged(
+        db.work_report_revisions,
+        [("report_id", ASCENDING), ("revision", ASCENDING)],
+        unique=True
+    )
+    await create_index_logged(db.work_report_tombstones, "id", unique=True)
+    await create_index_logged(
+        db.work_report_tombstones,
+        "deleted_at",
+        expireAfterSeconds=SYNC_TOMBSTONE_TTL_DAYS * 86400
+    )
+    await create_index_logged(
+        db.idempotency_keys,
+        "created_at",
+        expireAfterSeconds=IDEMPOTENCY_TTL_HOURS * 3600
+    )
+    await create_index_logged(db.export_jobs, "id", unique=True)
+    await create_index_logged(
+        db.export_jobs,
+        "dedupe_key",
+        unique=True,
+        partialFilterExpression={"active": True}
+    )
+    await create_index_logged(db.export_jobs, "expires_at")
+    layout = report_layout()
+    await refresh_index_names("users", layout["hot"], layout["archive"])
+
 # Lifespan event handler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    connect_database()
     try:
         await init_database()
+        await ensure_indexes()
+        await load_org_index()
+        if ARCHIVE_INTERVAL_HOURS > 0:
+            app.state.archive_task = asyncio.create_task(archive_scheduler())
         print("Application started successfully")
     except Exception as e:
         print(f"Startup error: {str(e)}")
+    _lifecycle["ready"] = True
     yield
     # Shutdown
+    _lifecycle["ready"] = False
+    begin_drain()
     try:
+        archive_task = getattr(app.state, "archive_task", None)
+        if archive_task:
+            archive_task.cancel()
         client.close()
+        if shared_cache is not None:
+            await shared_cache.close()
         print("Database connection closed")
     except Exception as e:
         print(f"Shutdown error: {str(e)}")
@@ -371,6 +1454,257 @@ app = FastAPI(
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Query budget routing - GET requests (and batches of them) get the budget of
+# the first matching rule. Writes keep the driver's socket timeout, since a
+# client-side deadline could abandon a write the server goes on to apply.
+QUERY_BUDGET_RULES = [
+    (None, re.compile(r"^/api/health(/|$)")),
+    ("reference", re.compile(r"^/api/(departments|manager-resources|status-options|managers|org-index|auth/jwks|auth/me)$")),
+    ("attendance", re.compile(r"^/api/attendance-summary$")),
+    ("export", re.compile(r"^/api/work-reports/export(/csv|/jobs/[^/]+/download)?$")),
+    ("work_reports", re.compile(r"^/api/work-reports(/|$)")),
+]
+# Budgets whose endpoints answer from memory or serve stale results while the breaker is open
+QUERY_BUDGET_FALLBACKS = {"reference", "attendance"}
+
+def query_budget(method: str, path: str) -> Optional[str]:
+    if method == "POST" and path == "/api/batch":
+        return "batch"
+    if method != "GET":
+        return None
+    for budget, pattern in QUERY_BUDGET_RULES:
+        if pattern.match(path):
+            return budget
+    return "default"
+
+def fails_fast(budget: Optional[str]) -> bool:
+    """Whether a request must be refused because the breaker is open and it has no fallback"""
+    return budget is not None and budget not in QUERY_BUDGET_FALLBACKS and not query_breaker.allow()
+
+class QueryBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        budget = query_budget(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+        
+        query_budget_monitor.request(budget)
+        if budget != "batch" and fails_fast(budget):
+            error = breaker_open_error()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code, headers=error.headers)
+            await response(scope, receive, send)
+            return
+        token = current_query_budget.set(budget)
+        try:
+            if budget in STREAMING_BUDGETS:
+                await self.app(scope, receive, send)
+            else:
+                with pymongo.timeout(QUERY_BUDGETS_MS[budget] / 1000):
+                    await self.app(scope, receive, send)
+        finally:
+            current_query_budget.reset(token)
+
+# Innermost, so the budget starts once the request is admitted by load shedding
+app.add_middleware(QueryBudgetMiddleware)
+
+# Load shedding - requests are classified by route and each class has its own
+# concurrency limit and queue timeout, so bcrypt logins and large exports cannot
+# take the event loop away from interactive reads. Limits of the adaptive, lower
+# priority classes follow AIMD on interactive latency: they shrink
+# multiplicatively while it is above target and grow back additively once it
+# recovers. Work that cannot start within its queue timeout is shed with 503.
+LOAD_SHEDDING_ENABLED = os.environ.get("LOAD_SHEDDING_ENABLED", "true").lower() == "true"
+INTERACTIVE_TARGET_MS = float(os.environ.get("INTERACTIVE_TARGET_MS", "250"))
+INTERACTIVE_LATENCY_ALPHA = 0.2
+AIMD_DECREASE_FACTOR = 0.7
+AIMD_DECREASE_INTERVAL_SECONDS = 1.0
+SHED_QUEUE_FACTOR = 4  # waiters allowed per unit of limit before arrivals are shed at once
+SHED_RETRY_AFTER_MAX_SECONDS = 30
+LATENCY_WINDOW = 1000
+
+# First matching (class, method, path pattern) wins; everything else is interactive
+ROUTE_CLASS_RULES = [
+    ("exempt", None, re.compile(r"^/api/health(/|$)")),
+    ("auth", "POST", re.compile(r"^/api/auth/(login|signup)$")),
+    # Streaming exports only - job creation and status polls are cheap and stay interactive
+    ("export", "GET", re.compile(r"^/api/work-reports/export(/csv|/jobs/[^/]+/download)?$")),
+    ("maintenance", None, re.compile(r"^/api/(work-reports/archive|work-reports/bulk|org-index/reload)$")),
+]
+# Maximum concurrency is overridable per class, e.g. ROUTE_LIMIT_EXPORT=2
+ROUTE_CLASS_LIMITS = {
+    name: {**config, "limit": int(os.environ.get(f"ROUTE_LIMIT_{name.upper()}", config["limit"]))}
+    for name, config in {
+        "interactive": {"limit": 128, "min_limit": 128, "queue_timeout": 5.0, "adaptive": False},
+        "auth": {"limit": 8, "min_limit": 2, "queue_timeout": 3.0, "adaptive": True},
+        "export": {"limit": 4, "min_limit": 1, "queue_timeout": 1.0, "adaptive": True},
+        "maintenance": {"limit": 2, "min_limit": 1, "queue_timeout": 1.0, "adaptive": True},
+    }.items()
+}
+
+class RouteLimiter:
+    def __init__(self, name: str, limit: int, min_limit: int, queue_timeout: float, adaptive: bool):
+        self.name = name
+        self.max_limit = limit
+        self.min_limit = min(min_limit, limit)
+        self.limit = float(limit)
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {"admitted": 0, "queued": 0, "shed": 0}
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to queue_timeout; False means the request is shed"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return True
+        if len(self._waiters) >= SHED_QUEUE_FACTOR * max(1, int(self.limit)):
+            self.stats["shed"] += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.stats["shed"] += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the client went away
+                self.release()
+            self._discard(waiter)
+            raise
+        self.stats["admitted"] += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self.wake()
+
+    def wake(self):
+        # Slots pass straight to waiters, oldest first
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def decrease(self):
+        self.limit = max(float(self.min_limit), self.limit * AIMD_DECREASE_FACTOR)
+
+    def increase(self):
+        self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        self.wake()
+
+    def retry_after(self) -> int:
+        # Back clients off for longer the further the limit has been cut
+        return min(SHED_RETRY_AFTER_MAX_SECONDS, math.ceil(self.queue_timeout * self.max_limit / max(self.limit, 1)))
+
+    def record(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        def percentile(q):
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+        return {
+            "limit": round(self.limit, 2),
+            "max_limit": self.max_limit,
+            "min_limit": self.min_limit,
+            "adaptive": self.adaptive,
+            "queue_timeout_seconds": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            **self.stats,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+        }
+
+class LoadShedder:
+    def __init__(self, limits: Dict[str, Dict[str, Any]]):
+        self.limiters = {name: RouteLimiter(name, **config) for name, config in limits.items()}
+        self.interactive_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        """Route class of a request, or None for requests that are never limited"""
+        for route_class, rule_method, pattern in ROUTE_CLASS_RULES:
+            if (rule_method is None or rule_method == method) and pattern.match(path):
+                return None if route_class == "exempt" else route_class
+        return "interactive"
+
+    def observe(self, route_class: str, seconds: float):
+        self.limiters[route_class].record(seconds)
+        if route_class != "interactive":
+            return
+        if self.interactive_latency is None:
+            self.interactive_latency = seconds
+        else:
+            self.interactive_latency += INTERACTIVE_LATENCY_ALPHA * (seconds - self.interactive_latency)
+        adaptive = [limiter for limiter in self.limiters.values() if limiter.adaptive]
+        if self.interactive_latency * 1000 > INTERACTIVE_TARGET_MS:
+            # At most one multiplicative cut per interval, however many requests complete
+            now = time.monotonic()
+            if now - self._last_decrease >= AIMD_DECREASE_INTERVAL_SECONDS:
+                self._last_decrease = now
+                for limiter in adaptive:
+                    limiter.decrease()
+        else:
+            for limiter in adaptive:
+                limiter.increase()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": LOAD_SHEDDING_ENABLED,
+            "interactive_target_ms": INTERACTIVE_TARGET_MS,
+            "interactive_latency_ms": round(self.interactive_latency * 1000, 1) if self.interactive_latency is not None else None,
+            "classes": {name: limiter.snapshot() for name, limiter in self.limiters.items()},
+        }
+
+load_shedder = LoadShedder(ROUTE_CLASS_LIMITS)
+
+class LoadSheddingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        route_class = load_shedder.classify(scope["method"], scope["path"]) if scope["type"] == "http" and LOAD_SHEDDING_ENABLED else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        
+        limiter = load_shedder.limiters[route_class]
+        started = time.monotonic()
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(limiter.retry_after())}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+            load_shedder.observe(route_class, time.monotonic() - started)
+
+# Inside CORS, so shed responses still get CORS headers
+app.add_middleware(LoadSheddingMiddleware)
+
 # CORS configuration
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
 
@@ -382,37 +1716,249 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression - gzip or Brotli depending on Accept-Encoding, only for
+# compressible content types above a per-type size threshold. Streaming bodies
+# are compressed incrementally, so StreamingResponse exports stay streamed.
+COMPRESSION_THRESHOLDS = {
+    "application/json": 1024,
+    "application/x-ndjson": 1024,
+    "text/csv": 512,
+    "text/plain": 1024,
+    "text/html": 1024,
+}
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    compressor = StreamCompressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip()
+                threshold = COMPRESSION_THRESHOLDS.get(content_type)
+                if threshold is not None:
+                    headers.add_vary_header("Accept-Encoding")
+                if (
+                    threshold is None
+                    or "content-encoding" in headers
+                    or start["status"] in (204, 206, 304)
+                    or (not more_body and len(body) < threshold)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                compressor = StreamCompressor(encoding)
+                if more_body:
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                    await send(start)
+                    chunk = compressor.compress(body)
+                    if chunk:
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                else:
+                    data = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(data))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": data})
+                return
+
+            if passthrough:
+                await send(message)
+                return
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+app.add_middleware(CompressionMiddleware)
+
+# Reference data bodies serialized and compressed once per source object
+_reference_bodies: Dict[str, Dict[str, Any]] = {}
+
+def reference_response(request: Request, key: str, source: Any, payload: Dict[str, Any]) -> Response:
+    entry = _reference_bodies.get(key)
+    if entry is None or entry["source"] is not source:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        entry = {
+            "source": source,
+            "identity": body,
+            "gzip": compress_body(body, "gzip"),
+            "br": compress_body(body, "br") if brotli is not None else None,
+            "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        }
+        _reference_bodies[key] = entry
+    
+    headers = {"ETag": entry["etag"], "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == entry["etag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    body = entry["identity"]
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None and len(body) >= COMPRESSION_THRESHOLDS["application/json"]:
+        body = entry[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # Health check endpoint
-@api_router.get("/health")
-async def health_check():
+# Health probes share one cached ping per process, refreshed at most every
+# HEALTH_CHECK_TTL_SECONDS, so load balancer traffic adds no database load
+HEALTH_CHECK_TTL_SECONDS = float(os.environ.get("HEALTH_CHECK_TTL_SECONDS", "5"))
+READINESS_TIMEOUT_SECONDS = 2
+health_checks = SingleFlight("health", ttl=HEALTH_CHECK_TTL_SECONDS)
+
+async def ping_database() -> Dict[str, Any]:
+    """Round trip a ping; failures are returned, not raised, so they are cached too"""
+    started = time.perf_counter()
     try:
-        # Test database connection
-        count = await db.users.count_documents({})
+        await asyncio.wait_for(db.command("ping"), READINESS_TIMEOUT_SECONDS)
         return {
-            "status": "healthy", 
-            "database": "connected",
-            "users_count": count,
-            "departments_available": len(DEPARTMENT_DATA)
+            "ok": True,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checked_at": datetime.now(timezone.utc),
         }
     except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__, "checked_at": datetime.now(timezone.utc)}
+
+async def database_health() -> Dict[str, Any]:
+    return await health_checks.do("ping", ping_database)
+
+async def count_users() -> int:
+    # Collection metadata, not a scan
+    return await db.users.estimated_document_count()
+
+@api_router.get("/health")
+async def health_check():
+    database = await database_health()
+    if not database["ok"]:
         return {
             "status": "unhealthy", 
-            "error": str(e),
+            "error": database["error"],
             "database": "disconnected"
         }
+    try:
+        users_count = await health_checks.do("users", count_users)
+    except Exception:
+        users_count = None
+    return {
+        "status": "healthy", 
+        "database": "connected",
+        "latency_ms": database["latency_ms"],
+        "users_count": users_count,
+        "departments_available": len(org_index.departments)
+    }
+
+# Liveness and readiness for process managers and load balancers, separate
+# from /health so a draining worker drops out of rotation
+@api_router.get("/health/live")
+async def liveness_check():
+    """The process is up and its event loop is serving requests - no database call"""
+    return {"status": "alive", "pid": os.getpid()}
+
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Whether this worker should receive traffic"""
+    if not _lifecycle["ready"] or _lifecycle["draining"]:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Draining" if _lifecycle["draining"] else "Starting"
+        )
+    database = await database_health()
+    if not database["ok"]:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable"
+        )
+    return {
+        "status": "ready",
+        "pid": os.getpid(),
+        "database": {**database, "cache_ttl_seconds": HEALTH_CHECK_TTL_SECONDS},
+        **driver_monitor.snapshot()
+    }
 
 # Routes
 @api_router.post("/auth/login")
 async def login(user_data: UserLogin):
     try:
-        user = await db.users.find_one({"email": user_data.email})
+        user = await find_user(user_data.email, with_password=True)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
         
-        if not verify_password(user_data.password, user["password_hash"]):
+        # bcrypt is CPU-bound - run it in a worker thread so the event loop keeps serving
+        if not await asyncio.to_thread(verify_password, user_data.password, user["password_hash"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
@@ -421,10 +1967,8 @@ async def login(user_data: UserLogin):
         # Convert MongoDB document to dict with proper ObjectId handling
         user_dict = convert_mongo_doc(user)
         
-        access_token = create_access_token(data={"sub": user["email"]})
         return {
-            "access_token": access_token,
-            "token_type": "bearer",
+            **issue_tokens(user_dict),
             "user": UserResponse(**user_dict)
         }
     except HTTPException:
@@ -439,30 +1983,38 @@ async def login(user_data: UserLogin):
 @api_router.post("/auth/signup")
 async def signup(user_data: UserCreate):
     try:
-        # Check if user already exists
-        existing_user = await db.users.find_one({"email": user_data.email})
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+        # Without the unique email index (e.g. case-variant duplicates blocked its
+        # creation) a DuplicateKeyError never comes, so check for the email first
+        if not index_available("users", EMAIL_INDEX):
+            existing = await db.users.find_one({"email": user_data.email}, {"_id": 1}, collation=EMAIL_COLLATION)
+            if existing is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
         
         # Create new user with provided role or default to employee
         user = User(
             name=user_data.name,
             email=user_data.email,
-            password_hash=hash_password(user_data.password),
+            password_hash=await asyncio.to_thread(hash_password, user_data.password),
             role=user_data.role,
             department=user_data.department,
             team=user_data.team
         )
         
-        await db.users.insert_one(user.dict())
+        # The case-insensitive unique email index rejects existing emails atomically
+        try:
+            await db.users.insert_one(user.dict())
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+        await invalidate_user_caches()
         
-        access_token = create_access_token(data={"sub": user.email})
         return {
-            "access_token": access_token,
-            "token_type": "bearer",
+            **issue_tokens(user.dict()),
             "user": UserResponse(**user.dict())
         }
     except HTTPException:
@@ -474,14 +2026,53 @@ async def signup(user_data: UserCreate):
             detail="Signup service temporarily unavailable"
         )
 
+@api_router.post("/auth/refresh")
+async def refresh_access_token(token_data: TokenRefresh):
+    payload = verify_token(token_data.refresh_token, token_type="refresh")
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    try:
+        # Re-read the user so role and team changes reach the new access token
+        user = await find_user(payload["sub"])
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        user_dict = convert_mongo_doc(user)
+        return {
+            **issue_tokens(user_dict),
+            "user": UserResponse(**user_dict)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Token refresh error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Authentication service temporarily unavailable"
+        )
+
+@api_router.get("/auth/jwks")
+async def get_jwks():
+    return public_jwks()
+
 @api_router.get("/auth/me")
 async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
     return current_user
 
 @api_router.get("/departments")
-async def get_departments():
+async def get_departments(request: Request):
     try:
-        return {"departments": DEPARTMENT_DATA}
+        departments = org_index.departments
+        return reference_response(request, "departments", departments, {"departments": departments})
     except Exception as e:
         logging.error(f"Departments error: {str(e)}")
         raise HTTPException(
@@ -490,9 +2081,10 @@ async def get_departments():
         )
 
 @api_router.get("/manager-resources")
-async def get_manager_resources():
+async def get_manager_resources(request: Request):
     try:
-        return {"manager_resources": MANAGER_RESOURCES}
+        manager_resources = org_index.manager_resources
+        return reference_response(request, "manager_resources", manager_resources, {"manager_resources": manager_resources})
     except Exception as e:
         logging.error(f"Manager resources error: {str(e)}")
         raise HTTPException(
@@ -501,9 +2093,9 @@ async def get_manager_resources():
         )
 
 @api_router.get("/status-options")
-async def get_status_options():
+async def get_status_options(request: Request):
     try:
-        return {"status_options": STATUS_OPTIONS}
+        return reference_response(request, "status_options", STATUS_OPTIONS, {"status_options": STATUS_OPTIONS})
     except Exception as e:
         logging.error(f"Status options error: {str(e)}")
         raise HTTPException(
@@ -511,12 +2103,847 @@ async def get_status_options():
             detail="Status options service temporarily unavailable"
         )
 
+# Report query planner - normalizes the filters shared by list, export and
+# analytics endpoints, applies role scoping, and picks the index hint,
+# projection and cache key, so every read path issues the same query shape.
+FILTER_SENTINELS = {"", "All", "All Departments", "All Teams", "All Reporting Managers"}
+
+# Hinted in this order: the first index whose leading field is filtered on wins
+REPORT_QUERY_INDEXES = [
+    (REPORT_UNIQUE_INDEX, [("employee_email", ASCENDING), ("date", ASCENDING)]),
+    ("team_date", [("team", ASCENDING), ("date", ASCENDING)]),
+    ("manager_date", [("reporting_manager", ASCENDING), ("date", ASCENDING)]),
+    ("department_date", [("department", ASCENDING), ("date", ASCENDING)]),
+    ("date_submitted", [("date", ASCENDING), ("submitted_at", DESCENDING)]),
+]
+REPORT_SORT_INDEX = ("submitted_at_desc", [("submitted_at", DESCENDING)])
+REPORT_SORT = [("submitted_at", DESCENDING)]
+
+REPORT_PROJECTIONS = {
+    "list": None,
+    "export": {
+        "_id": 0, "id": 1, "date": 1, "employee_name": 1, "employee_email": 1, "department": 1,
+        "team": 1, "reporting_manager": 1, "tasks": 1, "submitted_at": 1,
+    },
+    "attendance": {"_id": 0, "id": 1, "reporting_manager": 1, "employee_name": 1, "submitted_at": 1},
+    "history": {"_id": 0, "date": 1},
+    "bulk": {
+        "_id": 0, "id": 1, "team": 1, "date": 1, "employee_email": 1,
+        "tasks": 1, "revision": 1, "revisions_tracked": 1,
+    },
+}
+
+# Sparse fieldsets - ?fields= on report reads, validated against WorkReport and Task
+# and turned into the projection, so unrequested fields (task text in particular)
+# never leave the database. id is always returned; the sort keys are read for
+# paging and archive merging but trimmed from the response unless requested.
+SPARSE_FIELDS = set(WorkReport.model_fields) | {f"tasks.{field}" for field in Task.model_fields}
+SPARSE_SORT_KEYS = ("submitted_at", "last_modified_at")
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Requested report fields, or None for whole reports"""
+    if fields is None or not fields.strip():
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - SPARSE_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(SPARSE_FIELDS))}"
+        )
+    if "tasks" in requested:
+        # Whole tasks already include every task field, and the paths would collide
+        requested = {field for field in requested if not field.startswith("tasks.")}
+    return sorted(requested)
+
+def sparse_projection(fields: List[str]) -> Dict[str, int]:
+    return {"_id": 0, "id": 1, **{key: 1 for key in SPARSE_SORT_KEYS}, **{field: 1 for field in fields}}
+
+def trim_report(report: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return report
+    keep = {"id"} | {field.split(".", 1)[0] for field in fields}
+    return {key: value for key, value in report.items() if key in keep}
+
+# Storage layouts - "documents" keeps one document per report; "team_buckets"
+# keeps one document per (team, date) with that day's reports embedded in an
+# entries array, so a team-day dashboard reads a single document
+REPORT_STORAGE = os.environ.get("REPORT_STORAGE", "documents")
+REPORT_LAYOUTS = {
+    "documents": {"hot": "work_reports", "archive": "work_reports_archive", "key": "id", "id_field": "id"},
+    "team_buckets": {"hot": "work_report_buckets", "archive": "work_report_buckets_archive", "key": "_id", "id_field": "entries.id"},
+}
+if REPORT_STORAGE not in REPORT_LAYOUTS:
+    raise ValueError(f"REPORT_STORAGE must be one of: {', '.join(REPORT_LAYOUTS)}")
+
+# Filters on these fields apply to the bucket itself, the rest to its entries
+BUCKET_FIELDS = ("team", "date")
+# Entry conditions that hold for some entry of every bucket holding a match. Negative
+# ones ($ne, $nin, $not) would drop buckets mixing matching and non-matching entries.
+BUCKET_PUSHDOWN_OPERATORS = {"$eq", "$in", "$gt", "$gte", "$lt", "$lte"}
+BUCKET_INDEXES = [
+    ("team_date", [("team", ASCENDING), ("date", ASCENDING)], False),
+    ("date", [("date", ASCENDING)], False),
+    ("entries_id", [("entries.id", ASCENDING)], True),
+    ("entries_employee_date", [("entries.employee_email", ASCENDING), ("date", ASCENDING)], False),
+    ("entries_manager_date", [("entries.reporting_manager", ASCENDING), ("date", ASCENDING)], False),
+    ("entries_department_date", [("entries.department", ASCENDING), ("date", ASCENDING)], False),
+    ("entries_last_modified", [("entries.last_modified_at", ASCENDING)], False),
+]
+
+def report_layout(storage: Optional[str] = None) -> Dict[str, str]:
+    return REPORT_LAYOUTS[storage or REPORT_STORAGE]
+
+def bucket_id(team: str, date: str) -> str:
+    return f"{team}|{date}"
+
+class ReportQuery:
+    FILTER_FIELDS = ("department", "team", "manager", "from_date", "to_date")
+
+    def __init__(
+        self,
+        scope: str,
+        department: Optional[str] = None,
+        team: Optional[str] = None,
+        manager: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ):
+        self.scope = scope
+        self.department = self._normalize(department)
+        self.team = self._normalize(team)
+        self.manager = self._normalize(manager)
+        self.from_date = self._normalize(from_date)
+        self.to_date = self._normalize(to_date)
+        self.fields = fields
+
+    @staticmethod
+    def _normalize(value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        value = value.strip()
+        return None if value in FILTER_SENTINELS else value
+
+    @staticmethod
+    def scope_for(user: UserResponse) -> str:
+        # Managers see every report, so they share one scope
+        return "manager" if user.role == "manager" else f"employee:{user.email}"
+
+    @classmethod
+    def for_user(cls, user: UserResponse, **filters) -> "ReportQuery":
+        return cls(cls.scope_for(user), **filters)
+
+    @classmethod
+    def from_filters(cls, scope: str, filters: Dict[str, Optional[str]]) -> "ReportQuery":
+        return cls(scope, **{field: filters.get(field) for field in cls.FILTER_FIELDS})
+
+    @property
+    def employee_email(self) -> Optional[str]:
+        return self.scope.split(":", 1)[1] if self.scope.startswith("employee:") else None
+
+    def filters(self) -> Dict[str, Optional[str]]:
+        return {field: getattr(self, field) for field in self.FILTER_FIELDS}
+
+    def to_filter(self) -> Dict[str, Any]:
+        query = {}
+        if self.employee_email:
+            query["employee_email"] = self.employee_email
+        if self.department:
+            query["department"] = self.department
+        if self.team:
+            query["team"] = self.team
+        if self.manager:
+            query["reporting_manager"] = {"$in": org_index.manager_aliases(self.manager)}
+        date_range = {}
+        if self.from_date:
+            date_range["$gte"] = self.from_date
+        if self.to_date:
+            date_range["$lte"] = self.to_date
+        if date_range:
+            query["date"] = date_range
+        return query
+
+    def index_hint(self, collection_name: str) -> Optional[str]:
+        """The planned index, or None when it is missing on the collection"""
+        query = self.to_filter()
+        planned = next(
+            (name for name, keys in REPORT_QUERY_INDEXES if keys[0][0] in query),
+            REPORT_SORT_INDEX[0]
+        )
+        return planned if index_available(collection_name, planned) else None
+
+    def projection(self, purpose: str = "list") -> Optional[Dict[str, int]]:
+        if purpose == "list" and self.fields is not None:
+            return sparse_projection(self.fields)
+        return REPORT_PROJECTIONS[purpose]
+
+    def cache_key(self, purpose: str = "list") -> str:
+        return json.dumps([purpose, self.scope, self.filters(), self.fields], sort_keys=True)
+
+    def bucket_pipeline(self, extra: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Match buckets, unwind them into report documents and apply the exact filter"""
+        query = {**self.to_filter(), **(extra or {})}
+        bucket_query = {}
+        for field, condition in query.items():
+            if field in BUCKET_FIELDS:
+                bucket_query[field] = condition
+            elif not isinstance(condition, dict) or set(condition) <= BUCKET_PUSHDOWN_OPERATORS:
+                bucket_query[f"entries.{field}"] = condition
+        return [
+            {"$match": bucket_query},
+            {"$unwind": "$entries"},
+            {"$replaceRoot": {"newRoot": "$entries"}},
+            {"$match": query},
+        ]
+
+    def find(
+        self,
+        collection,
+        purpose: str = "list",
+        session=None,
+        extra: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[tuple]] = None,
+        limit: int = 0,
+        hint: bool = True
+    ):
+        """Sorted, index-hinted cursor for this query, unwinding buckets in the bucketed layout"""
+        sort = sort or REPORT_SORT
+        projection = self.projection(purpose)
+        # Exports stream outside any request deadline, so their cursors carry the budget
+        max_time_ms = QUERY_BUDGETS_MS["export"] if purpose == "export" else None
+        if REPORT_STORAGE == "team_buckets":
+            pipeline = self.bucket_pipeline(extra) + [{"$sort": dict(sort)}]
+            if limit:
+                pipeline.append({"$limit": limit})
+            if projection:
+                pipeline.append({"$project": projection})
+            options = {"maxTimeMS": max_time_ms} if max_time_ms else {}
+            return collection.aggregate(pipeline, session=session, allowDiskUse=True, **options)
+        cursor = collection.find(
+            {**self.to_filter(), **(extra or {})}, projection, session=session, max_time_ms=max_time_ms
+        ).sort(sort)
+        index = self.index_hint(collection.name) if hint else None
+        if index:
+            cursor = cursor.hint(index)
+        return cursor.limit(limit) if limit else cursor
+
+    def needs_archive(self) -> bool:
+        """Whether the date range reaches back past the archive horizon"""
+        return self.from_date is None or self.from_date < archive_cutoff()
+
+    def collections(self) -> List[str]:
+        layout = report_layout()
+        return [layout["hot"], layout["archive"]] if self.needs_archive() else [layout["hot"]]
+
+    async def fetch(self, endpoint: str, purpose: str = "list", email: Optional[str] = None, session=None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Up to limit reports, fanning out to the archive only when the date range reaches it"""
+        layout = report_layout()
+        reports = await self.find(report_collection(layout["hot"], endpoint, email), purpose, session, limit=limit).to_list(limit)
+        if not self.needs_archive():
+            return reports
+        extra = None
+        if len(reports) >= limit:
+            # Archived reports sorting after the last hot one cannot make the page
+            extra = {"submitted_at": {"$gte": reports[-1]["submitted_at"]}}
+        archived = await self.find(report_collection(layout["archive"], endpoint, email), purpose, session, extra, limit=limit).to_list(limit)
+        # A report edited while it was being archived can briefly be in both tiers; the hot copy wins
+        hot_ids = {report["id"] for report in reports}
+        archived = [report for report in archived if report["id"] not in hot_ids]
+        if not archived:
+            return reports
+        return sorted(reports + archived, key=lambda report: report["submitted_at"], reverse=True)[:limit]
+
+    async def stream(
+        self,
+        endpoint: str,
+        purpose: str = "list",
+        email: Optional[str] = None,
+        session=None,
+        batch_size: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        """All matching reports in sort order, merged across the hot and archive collections"""
+        cursors = []
+        for name in self.collections():
+            cursor = self.find(report_collection(name, endpoint, email), purpose, session, extra)
+            cursors.append(cursor.batch_size(batch_size) if batch_size else cursor)
+        async for report in merge_report_streams(cursors):
+            yield report
+
+    async def count(self, endpoint: str, email: Optional[str] = None) -> int:
+        total = 0
+        for name in self.collections():
+            collection = report_collection(name, endpoint, email)
+            if REPORT_STORAGE == "team_buckets":
+                result = await collection.aggregate(self.bucket_pipeline() + [{"$count": "reports"}]).to_list(1)
+                total += result[0]["reports"] if result else 0
+            else:
+                total += await collection.count_documents(self.to_filter())
+        return total
+
+def report_collection(name: str, endpoint: str, email: Optional[str] = None):
+    return causal_read_collection(name, endpoint, email) if email else read_collection(name, endpoint)
+
+async def _next_report(iterator) -> Optional[Dict[str, Any]]:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+async def merge_report_streams(cursors: List[Any]):
+    """Merge cursors sorted by REPORT_SORT into one stream, earlier cursors first on ties.
+    
+    A report in more than one cursor is yielded once, from the earliest cursor.
+    Copies share submitted_at, so only the ids at the current sort key are kept.
+    """
+    if len(cursors) == 1:
+        async for report in cursors[0]:
+            yield report
+        return
+    iterators = [cursor.__aiter__() for cursor in cursors]
+    heads = [await _next_report(iterator) for iterator in iterators]
+    tie_key, tie_ids = None, set()
+    while True:
+        pending = [index for index, head in enumerate(heads) if head is not None]
+        if not pending:
+            return
+        index = max(pending, key=lambda i: (heads[i]["submitted_at"], -i))
+        report = heads[index]
+        if report["submitted_at"] != tie_key:
+            tie_key, tie_ids = report["submitted_at"], set()
+        if report["id"] not in tie_ids:
+            tie_ids.add(report["id"])
+            yield report
+        heads[index] = await _next_report(iterators[index])
+
+# Archival tiering - reports dated before the horizon move out of work_reports
+# into work_reports_archive (block-compressed with zstd, same index layout), so
+# the hot collection and its indexes stay small enough to live in the cache.
+# Reads fan out to the archive only when their date range reaches past the horizon.
+# Archived reports are read-only, so archiving is opt-in: set ARCHIVE_INTERVAL_HOURS
+# for an in-process schedule (long-running servers), or call POST /work-reports/archive
+# from a cron job. Scheduled passes are time-bounded and continue in later passes.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_INTERVAL_HOURS = float(os.environ.get("ARCHIVE_INTERVAL_HOURS", "0"))  # 0 disables the in-process schedule
+ARCHIVE_PASS_SECONDS = float(os.environ.get("ARCHIVE_PASS_SECONDS", "20"))
+ARCHIVE_CONTINUE_SECONDS = 60  # pause before a pass, and between passes while a backlog remains
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_LEASE_SECONDS = 600
+ARCHIVE_STATE_ID = "work_reports"
+
+def archive_cutoff() -> str:
+    """Reports dated before this day belong in the archive"""
+    return (datetime.now(IST) - timedelta(days=ARCHIVE_AFTER_DAYS)).strftime("%Y-%m-%d")
+
+async def create_compressed_collection(name: str):
+    if name not in await db.list_collection_names():
+        try:
+            await db.create_collection(
+                name,
+                storageEngine={"wiredTiger": {"configString": "block_compressor=zstd"}}
+            )
+        except Exception as e:
+            # Already created by another instance, or zstd unavailable - default compression
+            print(f"Archive collection creation: {str(e)}")
+
+async def ensure_report_layout(storage: str):
+    """Archive collection of a layout, plus bucket indexes on both tiers when bucketed"""
+    layout = report_layout(storage)
+    await create_compressed_collection(layout["archive"])
+    if storage == "team_buckets":
+        for tier in ("hot", "archive"):
+            for name, keys, unique in BUCKET_INDEXES:
+                await create_index_logged(db[layout[tier]], keys, name=name, unique=unique)
+        return
+    archive = db[layout["archive"]]
+    await create_index_logged(archive, "id", unique=True)
+    # Same names as the hot collection so ReportQuery hints work on both
+    for name, keys in REPORT_QUERY_INDEXES[1:] + [REPORT_SORT_INDEX]:
+        await create_index_logged(archive, keys, name=name)
+    # One report per employee per day holds in the archive as well; older
+    # deployments built this index without the unique flag
+    try:
+        existing = (await archive.index_information()).get(REPORT_UNIQUE_INDEX)
+        if not (existing and existing.get("unique")):
+            if existing:
+                await archive.drop_index(REPORT_UNIQUE_INDEX)
+            await merge_duplicate_reports(archive)
+            await archive.create_index(REPORT_QUERY_INDEXES[0][1], unique=True, name=REPORT_UNIQUE_INDEX)
+    except Exception as e:
+        print(f"Archive uniqueness index error: {str(e)}")
+
+async def archive_documents(archive, batch: List[Dict[str, Any]], key: str):
+    """Upsert a batch into the archive; buckets are merged with an archived bucket of the same day"""
+    if key == "_id":
+        existing = {
+            bucket["_id"]: bucket
+            async for bucket in archive.find({"_id": {"$in": [bucket["_id"] for bucket in batch]}})
+        }
+        for bucket in batch:
+            if bucket["_id"] in existing:
+                # Reports submitted for the day after it was archived
+                entries = {entry["id"]: entry for entry in existing[bucket["_id"]]["entries"]}
+                entries.update({entry["id"]: entry for entry in bucket["entries"]})
+                bucket["entries"] = list(entries.values())
+    await archive.bulk_write(
+        [ReplaceOne({key: doc[key]}, doc, upsert=True) for doc in batch],
+        ordered=False
+    )
+
+async def drop_stale_archive_copies(hot, archive, batch: List[Dict[str, Any]], key: str):
+    """Remove archive copies of reports edited or deleted between the copy and the delete.
+    
+    An edited report is still in the hot collection, which stays authoritative until
+    the next run copies it again; a deleted one has a tombstone.
+    """
+    keys = [doc[key] for doc in batch]
+    still_hot = {doc[key]: doc async for doc in hot.find({key: {"$in": keys}}, None if key == "_id" else {"_id": 0, "id": 1})}
+    if key == "_id":
+        ids = [entry["id"] for bucket in batch for entry in bucket["entries"]]
+    else:
+        ids = keys
+    deleted = {tombstone["id"] async for tombstone in db.work_report_tombstones.find({"id": {"$in": ids}}, {"id": 1})}
+    if key != "_id":
+        stale = list(still_hot) + [report_id for report_id in deleted if report_id not in still_hot]
+        if stale:
+            await archive.delete_many({"id": {"$in": stale}})
+        return
+    for bucket in batch:
+        hot_ids = {entry["id"] for entry in still_hot.get(bucket["_id"], {}).get("entries", [])}
+        stale = [entry["id"] for entry in bucket["entries"] if entry["id"] in hot_ids or entry["id"] in deleted]
+        if stale:
+            await archive.update_one({"_id": bucket["_id"]}, {"$pull": {"entries": {"id": {"$in": stale}}}})
+            await archive.delete_one({"_id": bucket["_id"], "entries": {"$size": 0}})
+
+async def run_archive_job(time_budget: Optional[float] = None) -> Dict[str, Any]:
+    """Move reports dated before the horizon into the archive, in batches, under a lease"""
+    now = datetime.now(IST)
+    try:
+        await db.archive_state.find_one_and_update(
+            {"_id": ARCHIVE_STATE_ID, "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]},
+            {"$set": {"locked_until": now + timedelta(seconds=ARCHIVE_LEASE_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Lease held by another run
+        return {"status": "busy", "archived": 0, "has_more": True}
+    
+    layout = report_layout()
+    hot, archive, key = db[layout["hot"]], db[layout["archive"]], layout["key"]
+    cutoff = archive_cutoff()
+    deadline = time.monotonic() + time_budget if time_budget else None
+    archived = 0
+    has_more = False
+    try:
+        while True:
+            batch = await hot.find({"date": {"$lt": cutoff}}, None if key == "_id" else {"_id": 0}) \
+                .limit(ARCHIVE_BATCH_SIZE).to_list(ARCHIVE_BATCH_SIZE)
+            if not batch:
+                break
+            # Replace by key so a run interrupted between the two writes is safely repeated
+            await archive_documents(archive, batch, key)
+            # Only remove documents unchanged since they were copied; an edited one is
+            # copied again by the next run
+            result = await hot.bulk_write(
+                [DeleteOne({key: doc[key], "last_modified_at": doc.get("last_modified_at")}) for doc in batch],
+                ordered=False
+            )
+            archived += result.deleted_count
+            if result.deleted_count < len(batch):
+                await drop_stale_archive_copies(hot, archive, batch, key)
+            if result.deleted_count == 0 or (deadline and time.monotonic() > deadline):
+                has_more = True
+                break
+            await db.archive_state.update_one(
+                {"_id": ARCHIVE_STATE_ID},
+                {"$set": {"locked_until": datetime.now(IST) + timedelta(seconds=ARCHIVE_LEASE_SECONDS)}}
+            )
+    finally:
+        await db.archive_state.update_one(
+            {"_id": ARCHIVE_STATE_ID},
+            {
+                "$set": {"locked_until": None, "last_run_at": datetime.now(IST), "last_cutoff": cutoff},
+                "$inc": {"total_archived": archived}
+            }
+        )
+    if archived:
+        await invalidate_report_caches()
+    return {"status": "completed", "cutoff": cutoff, "archived": archived, "has_more": has_more}
+
+async def archive_scheduler():
+    # Not at startup - a cold start should not compete with its first requests
+    await asyncio.sleep(ARCHIVE_CONTINUE_SECONDS)
+    while True:
+        backlog = False
+        try:
+            result = await run_archive_job(time_budget=ARCHIVE_PASS_SECONDS)
+            if result["archived"]:
+                print(f"Archived {result['archived']} report(s) dated before {result['cutoff']}")
+            backlog = result["status"] == "completed" and result["has_more"]
+        except Exception as e:
+            logging.error(f"Archive job error: {str(e)}")
+        await asyncio.sleep(ARCHIVE_CONTINUE_SECONDS if backlog else ARCHIVE_INTERVAL_HOURS * 3600)
+
+# Layout migration - copies every report, hot and archived, into the other
+# layout. Copies replace by key, so the migration can be re-run to pick up
+# reports written while it was running before REPORT_STORAGE is switched.
+async def migrate_report_layout(target: str, drop_source: bool = False) -> Dict[str, int]:
+    """Copy all reports into the target layout; returns documents written per tier"""
+    if target not in REPORT_LAYOUTS:
+        raise ValueError(f"Unknown report layout: {target}")
+    source = next(name for name in REPORT_LAYOUTS if name != target)
+    await ensure_report_layout(target)
+    written = {}
+    for tier in ("hot", "archive"):
+        source_collection = db[report_layout(source)[tier]]
+        target_collection = db[report_layout(target)[tier]]
+        batch = []
+        written[tier] = 0
+        
+        if target == "team_buckets":
+            documents = source_collection.aggregate([
+                {"$project": {"_id": 0}},
+                {"$sort": {"team": 1, "date": 1, "submitted_at": 1}},
+                {"$group": {
+                    "_id": {"team": "$team", "date": "$date"},
+                    "entries": {"$push": "$$ROOT"},
+                    "last_modified_at": {"$max": "$last_modified_at"},
+                }},
+            ], allowDiskUse=True)
+            async for group in documents:
+                team, date = group["_id"]["team"], group["_id"]["date"]
+                batch.append(ReplaceOne(
+                    {"_id": bucket_id(team, date)},
+                    {"team": team, "date": date, "entries": group["entries"], "last_modified_at": group["last_modified_at"]},
+                    upsert=True
+                ))
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    await target_collection.bulk_write(batch, ordered=False)
+                    written[tier] += len(batch)
+                    batch = []
+        else:
+            async for bucket in source_collection.find({}, {"entries": 1}):
+                for entry in bucket["entries"]:
+                    batch.append(ReplaceOne({"id": entry["id"]}, entry, upsert=True))
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    await target_collection.bulk_write(batch, ordered=False)
+                    written[tier] += len(batch)
+                    batch = []
+        
+        if batch:
+            await target_collection.bulk_write(batch, ordered=False)
+            written[tier] += len(batch)
+        if drop_source:
+            await source_collection.drop()
+    return written
+
+@api_router.post("/work-reports/archive")
+async def archive_work_reports(current_user: UserResponse = Depends(get_current_user)):
+    """Run one archival pass now, bounded to fit a serverless request"""
+    try:
+        if current_user.role != "manager":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only managers can run archival"
+            )
+        
+        return await run_archive_job(time_budget=ARCHIVE_PASS_SECONDS)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Archive error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Archive service temporarily unavailable"
+        )
+
+# Report revisions - every change to a report's tasks appends a JSON Patch
+# (RFC 6902) diff to work_report_revisions, with a full snapshot every
+# REVISION_SNAPSHOT_INTERVAL revisions to bound reconstruction cost
+REVISION_SNAPSHOT_INTERVAL = int(os.environ.get("REVISION_SNAPSHOT_INTERVAL", "10"))
+
+def _escape_pointer(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def _unescape_pointer(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Minimal JSON Patch turning old into new, comparing lists by position"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape_pointer(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        for index in range(min(len(old), len(new))):
+            ops.extend(json_diff(old[index], new[index], f"{path}/{index}"))
+        for index in range(len(old), len(new)):
+            ops.append({"op": "add", "path": f"{path}/-", "value": new[index]})
+        for index in range(len(old) - 1, len(new) - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return ops
+    if old != new or type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+def apply_json_patch(document: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Apply add/remove/replace JSON Patch operations to a copy of document"""
+    document = json.loads(json.dumps(document))
+    for op in ops:
+        tokens = [_unescape_pointer(token) for token in op["path"].split("/")[1:]]
+        if not tokens:
+            document = op.get("value")
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                if last == "-":
+                    parent.append(op["value"])
+                else:
+                    parent.insert(int(last), op["value"])
+            elif op["op"] == "remove":
+                del parent[int(last)]
+            else:
+                parent[int(last)] = op["value"]
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = op["value"]
+    return document
+
+async def record_task_revision(before: Dict[str, Any], new_tasks: List[Dict[str, Any]], modified_by: str, session=None):
+    """Append the revision produced by an update whose pre-image is before"""
+    await db.work_report_revisions.insert_many(task_revision_docs(before, new_tasks, modified_by), session=session)
+
+def task_revision_docs(before: Dict[str, Any], new_tasks: List[Dict[str, Any]], modified_by: str) -> List[Dict[str, Any]]:
+    previous_revision = before.get("revision", 0)
+    revision = previous_revision + 1
+    now = datetime.now(IST)
+    docs = []
+    if not before.get("revisions_tracked"):
+        # First tracked change - keep the pre-image as the base snapshot
+        docs.append({
+            "report_id": before["id"],
+            "revision": previous_revision,
+            "kind": "snapshot",
+            "tasks": before["tasks"],
+            "modified_at": now,
+        })
+    if revision % REVISION_SNAPSHOT_INTERVAL == 0:
+        docs.append({"report_id": before["id"], "revision": revision, "kind": "snapshot", "tasks": new_tasks})
+    else:
+        docs.append({"report_id": before["id"], "revision": revision, "kind": "diff", "patch": json_diff(before["tasks"], new_tasks)})
+    docs[-1].update({"modified_by": modified_by, "modified_at": now})
+    return docs
+
+async def reconstruct_report_tasks(report_id: str, revision: int) -> Optional[List[Dict[str, Any]]]:
+    """Tasks of a report as of a revision: nearest snapshot at or before it plus the diffs after"""
+    snapshot = await db.work_report_revisions.find_one(
+        {"report_id": report_id, "kind": "snapshot", "revision": {"$lte": revision}},
+        sort=[("revision", DESCENDING)]
+    )
+    if snapshot is None:
+        return None
+    tasks = snapshot["tasks"]
+    diffs = db.work_report_revisions.find(
+        {"report_id": report_id, "revision": {"$gt": snapshot["revision"], "$lte": revision}},
+        {"_id": 0, "revision": 1, "kind": 1, "patch": 1, "tasks": 1}
+    ).sort("revision", ASCENDING)
+    last_revision = snapshot["revision"]
+    async for entry in diffs:
+        tasks = entry["tasks"] if entry["kind"] == "snapshot" else apply_json_patch(tasks, entry["patch"])
+        last_revision = entry["revision"]
+    return tasks if last_revision == revision else None
+
+# Report writes for the active storage layout
+REVISION_FIELDS = {"_id": 0, "id": 1, "tasks": 1, "revision": 1, "revisions_tracked": 1}
+
+async def move_bucket_entry(buckets, entry_id: str, source: str, team: str, date: str, session=None):
+    """Move an entry into its team-day bucket after the employee's team changed"""
+    # Pulled before it is pushed, since entries.id is unique across buckets
+    before = await buckets.find_one_and_update(
+        {"_id": source, "entries.id": entry_id},
+        {"$pull": {"entries": {"id": entry_id}}, "$currentDate": {"last_modified_at": True}},
+        projection={"entries.$": 1},
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+    if before is None:
+        # A concurrent submission moved it already
+        return
+    await buckets.update_one(
+        {"_id": bucket_id(team, date)},
+        {
+            "$setOnInsert": {"team": team, "date": date},
+            "$push": {"entries": before["entries"][0]},
+            "$currentDate": {"last_modified_at": True},
+        },
+        upsert=True,
+        session=session
+    )
+    await buckets.delete_one({"_id": source, "entries": {"$size": 0}}, session=session)
+
+async def store_report(report: WorkReport, modified_by: str, session=None) -> tuple:
+    """Store a new report, or append its tasks to the employee's report for that day; returns (report_id, merged)"""
+    report_doc = report.dict()
+    new_tasks = report_doc["tasks"]
+    merge_fields = {
+        "employee_name": report.employee_name,
+        "department": report.department,
+        "team": report.team,
+        "reporting_manager": report.reporting_manager,
+        "revisions_tracked": True,
+    }
+    
+    if REPORT_STORAGE == "team_buckets":
+        buckets = db[report_layout()["hot"]]
+        key = bucket_id(report.team, report.date)
+        for attempt in range(3):
+            # The employee already reported that day - merge into that entry, in
+            # whichever team's bucket it is, so changing teams does not add a second one
+            before = await buckets.find_one_and_update(
+                {"date": report.date, "entries.employee_email": report.employee_email},
+                {
+                    "$set": {f"entries.$.{field}": value for field, value in merge_fields.items()},
+                    "$push": {"entries.$.tasks": {"$each": new_tasks}},
+                    "$inc": {"entries.$.revision": 1},
+                    "$currentDate": {"entries.$.last_modified_at": True, "last_modified_at": True},
+                },
+                projection={"entries.$": 1},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if before is not None:
+                entry = before["entries"][0]
+                if before["_id"] != key:
+                    await move_bucket_entry(buckets, entry["id"], before["_id"], report.team, report.date, session=session)
+                await record_task_revision(entry, entry["tasks"] + new_tasks, modified_by, session=session)
+                return entry["id"], True
+            try:
+                # Append a new entry, creating the bucket on the first report of the day
+                await buckets.update_one(
+                    {"_id": key, "entries.employee_email": {"$ne": report.employee_email}},
+                    {
+                        "$setOnInsert": {"team": report.team, "date": report.date},
+                        "$push": {"entries": report_doc},
+                        "$currentDate": {"last_modified_at": True},
+                    },
+                    upsert=True,
+                    session=session
+                )
+                return report.id, False
+            except DuplicateKeyError:
+                # A concurrent submission added this employee's entry first
+                continue
+        raise RuntimeError(f"Could not store report for {report.employee_email} on {report.date}")
+    
+    try:
+        await db.work_reports.insert_one(report_doc, session=session)
+        return report.id, False
+    except DuplicateKeyError:
+        # The (employee_email, date) index already holds a report for this
+        # day - append the new tasks to it instead of creating a duplicate
+        before = await db.work_reports.find_one_and_update(
+            {"employee_email": report.employee_email, "date": report.date},
+            {
+                "$set": merge_fields,
+                "$push": {"tasks": {"$each": new_tasks}},
+                "$inc": {"revision": 1},
+                # Server-side clock, so change tokens do not depend on app instance clocks
+                "$currentDate": {"last_modified_at": True},
+            },
+            projection=REVISION_FIELDS,
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if before is None:
+            raise
+        await record_task_revision(before, before["tasks"] + new_tasks, modified_by, session=session)
+        return before["id"], True
+
+async def update_report_fields(report_id: str, fields: Dict[str, Any], session=None) -> Optional[Dict[str, Any]]:
+    """Set fields on a live report and bump its revision; returns the report before the update"""
+    if REPORT_STORAGE == "team_buckets":
+        before = await db[report_layout()["hot"]].find_one_and_update(
+            {"entries.id": report_id},
+            {
+                "$set": {f"entries.$.{field}": value for field, value in fields.items()},
+                "$inc": {"entries.$.revision": 1},
+                "$currentDate": {"entries.$.last_modified_at": True, "last_modified_at": True},
+            },
+            projection={"entries.$": 1},
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        return before["entries"][0] if before else None
+    
+    return await db.work_reports.find_one_and_update(
+        {"id": report_id},
+        {"$set": fields, "$inc": {"revision": 1}, "$currentDate": {"last_modified_at": True}},
+        projection=REVISION_FIELDS,
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+
+async def is_archived_report(report_id: str) -> bool:
+    layout = report_layout()
+    return bool(await db[layout["archive"]].count_documents({layout["id_field"]: report_id}, limit=1))
+
+async def has_archived_report(employee_email: str, date: str) -> bool:
+    """Whether the employee's report for a day before the horizon is in the archive"""
+    if date >= archive_cutoff():
+        return False
+    layout = report_layout()
+    field = "entries.employee_email" if REPORT_STORAGE == "team_buckets" else "employee_email"
+    return bool(await db[layout["archive"]].count_documents({field: employee_email, "date": date}, limit=1))
+
+async def remove_report(report_id: str, session=None) -> Optional[Dict[str, Any]]:
+    """Delete a report from the hot collection and the archive; returns the deleted report.
+    
+    Both tiers are checked, since a report edited while being archived can
+    briefly have a copy in each.
+    """
+    layout = report_layout()
+    removed = None
+    for name in (layout["hot"], layout["archive"]):
+        collection = db[name]
+        if REPORT_STORAGE == "team_buckets":
+            bucket = await collection.find_one_and_update(
+                {"entries.id": report_id},
+                {"$pull": {"entries": {"id": report_id}}, "$currentDate": {"last_modified_at": True}},
+                projection={"entries.$": 1},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if bucket is not None:
+                await collection.delete_one({"_id": bucket["_id"], "entries": {"$size": 0}}, session=session)
+                removed = removed or bucket["entries"][0]
+        else:
+            report = await collection.find_one_and_delete({"id": report_id}, session=session)
+            removed = removed or report
+    return removed
+
 @api_router.post("/work-reports")
 async def create_work_report(
     report_data: WorkReportCreate,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
-    try:
+    async def submit():
         report = WorkReport(
             employee_name=report_data.employee_name,
             employee_email=current_user.email,
@@ -526,9 +2953,32 @@ async def create_work_report(
             date=report_data.date,
             tasks=report_data.tasks
         )
+        # Tasks cannot be merged into an archived report, and a second report
+        # for the day would break one report per employee per day
+        if await has_archived_report(current_user.email, report.date):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The report for this date is archived and read-only"
+            )
+        
+        async with causal_session(current_user.email) as session:
+            report_id, merged = await store_report(report, current_user.email, session=session)
+            remember_write(current_user.email, session)
         
-        await db.work_reports.insert_one(report.dict())
-        return {"message": "Work report submitted successfully", "report_id": report.id}
+        await invalidate_report_caches()
+        return {
+            "message": "Tasks added to your report for this date" if merged else "Work report submitted successfully",
+            "report_id": report_id,
+            "merged": merged
+        }
+    
+    try:
+        # Retried submissions with the same key replay the first result instead of re-merging tasks
+        return await run_idempotent(
+            f"{current_user.email}|POST /work-reports", idempotency_key, report_data.dict(exclude_unset=True), submit
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Create work report error: {str(e)}")
         raise HTTPException(
@@ -543,46 +2993,198 @@ async def get_work_reports(
     team: Optional[str] = None,
     manager: Optional[str] = None,
     from_date: Optional[str] = None,
-    to_date: Optional[str] = None
+    to_date: Optional[str] = None,
+    fields: Optional[str] = None
 ):
+    requested_fields = parse_fields(fields)
     try:
-        # Build query
-        query = {}
+        # Employees only see their own reports
+        report_query = ReportQuery.for_user(
+            current_user,
+            department=department,
+            team=team,
+            manager=manager,
+            from_date=from_date,
+            to_date=to_date,
+            fields=requested_fields
+        )
+        
+        async def fetch_reports():
+            # The list may come from a secondary up to the staleness bound behind
+            sync_started_at = datetime.now(timezone.utc) - timedelta(
+                seconds=ANALYTICS_MAX_STALENESS_SECONDS + SYNC_OVERLAP_SECONDS
+            )
+            async with causal_session(current_user.email) as session:
+                reports = await report_query.fetch("work_reports", email=current_user.email, session=session)
+            
+            # Convert MongoDB documents to dict with proper ObjectId handling
+            return [convert_mongo_doc(trim_report(report, requested_fields)) for report in reports], sync_started_at
         
-        # If user is employee, only show their reports
-        if current_user.role == "employee":
-            query["employee_email"] = current_user.email
+        if has_pending_write(current_user.email):
+            # Read-your-own-writes - never serve this user a shared result
+            reports_list, sync_started_at = await fetch_reports()
+        else:
+            reports_list, sync_started_at = await report_list_queries.do(report_query.cache_key(), fetch_reports)
         
-        # Apply filters
-        if department and department != "All Departments":
-            query["department"] = department
-        if team and team != "All Teams":
-            query["team"] = team
-        if manager and manager != "All Reporting Managers":
-            query["reporting_manager"] = manager
+        return {"reports": reports_list, "sync_token": make_sync_token(sync_started_at)}
+    except Exception as e:
+        logging.error(f"Get work reports error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Work reports service temporarily unavailable"
+        )
+
+@api_router.get("/work-reports/changes")
+async def get_work_report_changes(
+    since: str,
+    current_user: UserResponse = Depends(get_current_user),
+    department: Optional[str] = None,
+    team: Optional[str] = None,
+    manager: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Reports inserted or modified since a sync token, plus ids of deleted reports"""
+    try:
+        since_time = parse_sync_token(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    requested_fields = parse_fields(fields)
+    
+    try:
+        requested_at = datetime.now(timezone.utc)
+        if since_time < requested_at - timedelta(days=SYNC_TOMBSTONE_TTL_DAYS):
+            # Deletes older than the tombstone retention are gone - client must refetch
+            return {"reset": True, "changes": [], "deleted": [], "has_more": False, "next_token": None}
         
-        # Date filtering
-        if from_date and to_date:
-            query["date"] = {"$gte": from_date, "$lte": to_date}
-        elif from_date:
-            query["date"] = {"$gte": from_date}
-        elif to_date:
-            query["date"] = {"$lte": to_date}
+        report_query = ReportQuery.for_user(
+            current_user,
+            department=department,
+            team=team,
+            manager=manager,
+            from_date=from_date,
+            to_date=to_date,
+            fields=requested_fields
+        )
+        tombstone_query = {"deleted_at": {"$gte": since_time}}
+        if report_query.employee_email:
+            tombstone_query["employee_email"] = report_query.employee_email
         
-        cursor = db.work_reports.find(query).sort("submitted_at", -1)
-        reports = await cursor.to_list(1000)
+        # A lagging secondary would let writes slip behind the next token for good
+        reports_collection = read_collection(report_layout()["hot"], "sync")
+        async with causal_session(current_user.email) as session:
+            changed = await report_query.find(
+                reports_collection,
+                session=session,
+                extra={"last_modified_at": {"$gte": since_time}},
+                sort=[("last_modified_at", ASCENDING)],
+                limit=SYNC_PAGE_SIZE + 1,
+                hint=False
+            ).to_list(SYNC_PAGE_SIZE + 1)
+            deleted = await db.work_report_tombstones.find(
+                tombstone_query, {"_id": 0, "id": 1, "deleted_at": 1}, session=session
+            ).sort("deleted_at", 1).limit(SYNC_PAGE_SIZE + 1).to_list(SYNC_PAGE_SIZE + 1)
         
-        # Convert MongoDB documents to dict with proper ObjectId handling
-        reports_list = [convert_mongo_doc(report) for report in reports]
+        # When a page overflows, resume from the earliest cut-off; anything after it
+        # in the other list is sent again, which clients apply idempotently by id
+        cutoffs = []
+        if len(changed) > SYNC_PAGE_SIZE:
+            changed = changed[:SYNC_PAGE_SIZE]
+            cutoffs.append(changed[-1]["last_modified_at"])
+        if len(deleted) > SYNC_PAGE_SIZE:
+            deleted = deleted[:SYNC_PAGE_SIZE]
+            cutoffs.append(deleted[-1]["deleted_at"])
+        if cutoffs:
+            next_time = min(_as_utc(cutoff) for cutoff in cutoffs)
+        else:
+            next_time = max(since_time, requested_at - timedelta(seconds=SYNC_OVERLAP_SECONDS))
         
-        return {"reports": reports_list}
+        return {
+            "reset": False,
+            "changes": [convert_mongo_doc(trim_report(report, requested_fields)) for report in changed],
+            "deleted": [tombstone["id"] for tombstone in deleted],
+            "has_more": bool(cutoffs),
+            "next_token": make_sync_token(next_time),
+        }
     except Exception as e:
-        logging.error(f"Get work reports error: {str(e)}")
+        logging.error(f"Work report changes error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Work reports service temporarily unavailable"
+            detail="Work report sync service temporarily unavailable"
+        )
+
+@api_router.get("/work-reports/me/history")
+async def get_my_report_history(
+    current_user: UserResponse = Depends(get_current_user),
+    year: Optional[int] = None
+):
+    """Compact calendar of the dates the current user submitted a report on"""
+    try:
+        if year is None:
+            year = datetime.now(IST).year
+        
+        # Covered by the (employee_email, date) index - no documents are fetched
+        report_query = ReportQuery(f"employee:{current_user.email}", from_date=f"{year}-01-01", to_date=f"{year}-12-31")
+        dates = []
+        async with causal_session(current_user.email) as session:
+            for name in report_query.collections():
+                cursor = report_query.find(
+                    causal_read_collection(name, "work_reports", current_user.email),
+                    "history",
+                    session=session,
+                    sort=[("date", ASCENDING)]
+                )
+                dates.extend([doc["date"] async for doc in cursor])
+        dates = sorted(set(dates))
+        
+        months: Dict[str, List[int]] = {}
+        for report_date in dates:
+            months.setdefault(report_date[:7], []).append(int(report_date[8:10]))
+        
+        return {"year": year, "total": len(dates), "months": months}
+    except Exception as e:
+        logging.error(f"Report history error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Report history service temporarily unavailable"
         )
 
+async def build_attendance_summary(date: str) -> Dict[str, Any]:
+    # Get all reports for the specified date
+    report_query = ReportQuery("manager", from_date=date, to_date=date)
+    reports = await report_query.fetch("attendance", "attendance")
+    
+    # Group reports by manager, resolving full names to the manager labels
+    manager_attendance = {}
+    
+    for report in reports:
+        manager = org_index.resolve_manager(report["reporting_manager"]) or report["reporting_manager"]
+        if manager not in manager_attendance:
+            manager_attendance[manager] = {
+                "present": [],
+                "total_resources": org_index.manager_resources.get(manager, 0)
+            }
+        manager_attendance[manager]["present"].append(report["employee_name"])
+    
+    # Calculate absent employees for each manager
+    attendance_summary = {}
+    for manager, resources in org_index.manager_resources.items():
+        present_count = len(manager_attendance.get(manager, {}).get("present", []))
+        absent_count = resources - present_count
+        
+        attendance_summary[manager] = {
+            "total_resources": resources,
+            "present": present_count,
+            "absent": absent_count,
+            "present_employees": manager_attendance.get(manager, {}).get("present", [])
+        }
+    
+    return attendance_summary
+
 @api_router.get("/attendance-summary")
 async def get_attendance_summary(
     current_user: UserResponse = Depends(get_current_user),
@@ -594,38 +3196,17 @@ async def get_attendance_summary(
             # Default to today
             date = datetime.now(IST).strftime("%Y-%m-%d")
         
-        # Get all reports for the specified date
-        reports = await db.work_reports.find({"date": date}).to_list(1000)
-        
-        # Group reports by manager
-        manager_attendance = {}
-        
-        for report in reports:
-            manager = report["reporting_manager"]
-            if manager not in manager_attendance:
-                manager_attendance[manager] = {
-                    "present": [],
-                    "total_resources": MANAGER_RESOURCES.get(manager, 0)
-                }
-            manager_attendance[manager]["present"].append(report["employee_name"])
-        
-        # Calculate absent employees for each manager
-        attendance_summary = {}
-        for manager, resources in MANAGER_RESOURCES.items():
-            present_count = len(manager_attendance.get(manager, {}).get("present", []))
-            absent_count = resources - present_count
-            
-            attendance_summary[manager] = {
-                "total_resources": resources,
-                "present": present_count,
-                "absent": absent_count,
-                "present_employees": manager_attendance.get(manager, {}).get("present", [])
-            }
+        attendance_summary = await attendance_queries.do(
+            ReportQuery("manager", from_date=date, to_date=date).cache_key("attendance"),
+            lambda: build_attendance_summary(date)
+        )
         
         return {
             "date": date,
             "attendance_summary": attendance_summary
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Attendance summary error: {str(e)}")
         raise HTTPException(
@@ -633,125 +3214,418 @@ async def get_attendance_summary(
             detail="Attendance summary service temporarily unavailable"
         )
 
-@api_router.put("/work-reports/{report_id}")
-async def update_work_report(
+@api_router.get("/work-reports/{report_id}/revisions")
+async def get_report_revisions(
     report_id: str,
-    report_data: WorkReportUpdate,
     current_user: UserResponse = Depends(get_current_user)
 ):
     try:
-        # Check if user is manager
         if current_user.role != "manager":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only managers can edit reports"
+                detail="Only managers can view report history"
             )
         
-        # Find the report
-        report = await db.work_reports.find_one({"id": report_id})
-        if not report:
+        revisions = await db.work_report_revisions.find(
+            {"report_id": report_id},
+            {"_id": 0, "revision": 1, "kind": 1, "modified_by": 1, "modified_at": 1, "patch": 1}
+        ).sort("revision", ASCENDING).to_list(1000)
+        if not revisions:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Report not found"
+                detail="No history recorded for this report"
             )
         
-        # Update the report
-        update_data = {
-            "tasks": [task.dict() for task in report_data.tasks],
-            "last_modified_at": datetime.now(IST),
-            "last_modified_by": current_user.email
+        return {
+            "report_id": report_id,
+            "revisions": [{
+                "revision": entry["revision"],
+                "kind": entry["kind"],
+                "modified_by": entry.get("modified_by"),
+                "modified_at": entry["modified_at"],
+                "changes": len(entry.get("patch", [])),
+            } for entry in revisions]
         }
-        
-        await db.work_reports.update_one(
-            {"id": report_id},
-            {"$set": update_data}
-        )
-        
-        return {"message": "Report updated successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Update work report error: {str(e)}")
+        logging.error(f"Report revisions error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Work report update service temporarily unavailable"
+            detail="Report history service temporarily unavailable"
         )
 
-@api_router.delete("/work-reports/{report_id}")
-async def delete_work_report(
+@api_router.get("/work-reports/{report_id}/revisions/{revision}")
+async def get_report_revision(
     report_id: str,
+    revision: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
     try:
-        # Check if user is manager
         if current_user.role != "manager":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only managers can delete reports"
+                detail="Only managers can view report history"
             )
         
-        # Find the report
-        report = await db.work_reports.find_one({"id": report_id})
-        if not report:
+        tasks = await reconstruct_report_tasks(report_id, revision)
+        if tasks is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Report not found"
+                detail="Revision not found"
             )
         
-        # Delete the report
-        await db.work_reports.delete_one({"id": report_id})
-        
-        return {"message": "Report deleted successfully"}
+        return {"report_id": report_id, "revision": revision, "tasks": tasks}
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Delete work report error: {str(e)}")
+        logging.error(f"Report revision error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Work report delete service temporarily unavailable"
+            detail="Report history service temporarily unavailable"
         )
 
-@api_router.get("/work-reports/export/csv")
-async def export_csv(
-    current_user: UserResponse = Depends(get_current_user),
-    department: Optional[str] = None,
-    team: Optional[str] = None,
-    manager: Optional[str] = None,
-    from_date: Optional[str] = None,
-    to_date: Optional[str] = None
-):
-    try:
-        # Build query (same as get_work_reports)
-        query = {}
-        
-        if current_user.role == "employee":
-            query["employee_email"] = current_user.email
-        
-        if department and department != "All Departments":
-            query["department"] = department
-        if team and team != "All Teams":
-            query["team"] = team
-        if manager and manager != "All Reporting Managers":
-            query["reporting_manager"] = manager
-        
-        if from_date and to_date:
-            query["date"] = {"$gte": from_date, "$lte": to_date}
-        elif from_date:
-            query["date"] = {"$gte": from_date}
-        elif to_date:
-            query["date"] = {"$lte": to_date}
-        
-        reports = await db.work_reports.find(query).sort("submitted_at", -1).to_list(1000)
-        
-        # Create CSV without pandas - lightweight approach
-        csv_lines = []
-        csv_lines.append("Date,Employee Name,Department,Team,Reporting Manager,Task Details,Status,Submitted At")
-        
-        for report in reports:
-            for task in report["tasks"]:
-                details = task["details"].replace('"', '""')
-                csv_line = f'"{report["date"]}","{report["employee_name"]}","{report["department"]}","{report["team"]}","{report["reporting_manager"]}","{details}","{task["status"]}","{report["submitted_at"].strftime("%Y-%m-%d %H:%M:%S IST")}"'
-                csv_lines.append(csv_line)
+# Bulk manager operations - reports are selected by ids and/or the shared list
+# filters and changed with one bulk write. Each status write is conditioned on the
+# revision that was read, so its revision log entry is exact; a report edited in
+# between is left alone and counted as matched but not modified.
+BULK_MAX_REPORTS = 5000
+
+def bulk_selection_query(selection: BulkReportSelection) -> tuple:
+    """(ReportQuery, extra filter) for a bulk selection; an empty selection is rejected"""
+    report_query = ReportQuery.from_filters("manager", selection.dict())
+    if not selection.ids and not report_query.to_filter():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Select reports by ids or at least one filter"
+        )
+    return report_query, ({"id": {"$in": selection.ids}} if selection.ids else {})
+
+async def select_bulk_reports(report_query: ReportQuery, extra: Dict[str, Any], name: str, session=None) -> List[Dict[str, Any]]:
+    # An id list is served by the id index, not the filter's hint
+    reports = await report_query.find(
+        db[name], "bulk", session, extra, limit=BULK_MAX_REPORTS + 1, hint="id" not in extra
+    ).to_list(BULK_MAX_REPORTS + 1)
+    if len(reports) > BULK_MAX_REPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Selection matches more than {BULK_MAX_REPORTS} reports - narrow the filters"
+        )
+    return reports
+
+def status_change_op(report: Dict[str, Any], from_status: str, to_status: str, modified_by: str) -> UpdateOne:
+    """Rewrite from_status tasks of one report, if it is still at the revision that was read"""
+    if REPORT_STORAGE == "team_buckets":
+        return UpdateOne(
+            {"entries": {"$elemMatch": {"id": report["id"], "revision": report.get("revision")}}},
+            {
+                "$set": {
+                    "entries.$[entry].tasks.$[task].status": to_status,
+                    "entries.$[entry].last_modified_by": modified_by,
+                    "entries.$[entry].revisions_tracked": True,
+                },
+                "$inc": {"entries.$[entry].revision": 1},
+                "$currentDate": {"entries.$[entry].last_modified_at": True, "last_modified_at": True},
+            },
+            array_filters=[{"entry.id": report["id"]}, {"task.status": from_status}]
+        )
+    return UpdateOne(
+        {"id": report["id"], "revision": report.get("revision")},
+        {
+            "$set": {"tasks.$[task].status": to_status, "last_modified_by": modified_by, "revisions_tracked": True},
+            "$inc": {"revision": 1},
+            "$currentDate": {"last_modified_at": True},
+        },
+        array_filters=[{"task.status": from_status}]
+    )
+
+async def record_bulk_revisions(reports: List[Dict[str, Any]], from_status: str, to_status: str, modified_by: str, applied: int, session=None):
+    """Revision log entries for the reports a bulk status change rewrote"""
+    changes = {
+        report["id"]: (report, [dict(task, status=to_status) if task.get("status") == from_status else task for task in report["tasks"]])
+        for report in reports
+    }
+    if applied < len(reports):
+        # Some reports were edited between the read and the write - keep those now
+        # holding exactly the revision and tasks this write produces
+        current = await ReportQuery("manager").find(
+            db[report_layout()["hot"]], "bulk", session, {"id": {"$in": list(changes)}}, hint=False
+        ).to_list(len(changes))
+        changes = {
+            report["id"]: changes[report["id"]]
+            for report in current
+            if report.get("revision", 0) == changes[report["id"]][0].get("revision", 0) + 1
+            and report["tasks"] == changes[report["id"]][1]
+        }
+    docs = [doc for before, new_tasks in changes.values() for doc in task_revision_docs(before, new_tasks, modified_by)]
+    if not docs:
+        return
+    try:
+        await db.work_report_revisions.insert_many(docs, ordered=False, session=session)
+    except BulkWriteError as e:
+        # A concurrent single edit already logged the same revision
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+
+async def delete_reports(collection, reports: List[Dict[str, Any]], session=None) -> int:
+    """Delete the given reports from one collection of the active layout; returns how many were removed"""
+    ids = [report["id"] for report in reports]
+    if REPORT_STORAGE == "team_buckets":
+        # One bucket at a time, so each pre-image shows which entries this pull
+        # removed - a concurrent delete may have taken some of them already
+        pending = set(ids)
+        removed = 0
+        while pending:
+            before = await collection.find_one_and_update(
+                {"entries.id": {"$in": list(pending)}},
+                {"$pull": {"entries": {"id": {"$in": list(pending)}}}, "$currentDate": {"last_modified_at": True}},
+                projection={"entries.id": 1},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if before is None:
+                break
+            pulled = pending & {entry["id"] for entry in before["entries"]}
+            removed += len(pulled)
+            pending -= pulled
+            await collection.delete_one({"_id": before["_id"], "entries": {"$size": 0}}, session=session)
+        return removed
+    result = await collection.delete_many({"id": {"$in": ids}}, session=session)
+    return result.deleted_count
+
+@api_router.patch("/work-reports/bulk")
+async def bulk_update_work_reports(
+    update: BulkStatusUpdate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    try:
+        if current_user.role != "manager":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only managers can edit reports"
+            )
+        if update.from_status not in STATUS_OPTIONS or update.to_status not in STATUS_OPTIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Statuses must be one of: {', '.join(STATUS_OPTIONS)}"
+            )
+        if update.from_status == update.to_status:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="from_status and to_status must differ"
+            )
+        report_query, extra = bulk_selection_query(update)
+        
+        # Archived reports are read-only, so only the hot collection changes
+        hot = report_layout()["hot"]
+        async with causal_session(current_user.email) as session:
+            reports = await select_bulk_reports(report_query, {**extra, "tasks.status": update.from_status}, hot, session)
+            if not reports:
+                return {"message": "No reports matched", "matched": 0, "modified": 0}
+            result = await db[hot].bulk_write(
+                [status_change_op(report, update.from_status, update.to_status, current_user.email) for report in reports],
+                ordered=False,
+                session=session
+            )
+            await record_bulk_revisions(
+                reports, update.from_status, update.to_status, current_user.email, result.matched_count, session=session
+            )
+            remember_write(current_user.email, session)
+        await invalidate_report_caches()
+        
+        return {
+            "message": f"Updated {result.modified_count} report(s)",
+            "matched": len(reports),
+            "modified": result.modified_count
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Bulk update work reports error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Work report update service temporarily unavailable"
+        )
+
+@api_router.delete("/work-reports/bulk")
+async def bulk_delete_work_reports(
+    selection: BulkReportSelection,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    try:
+        if current_user.role != "manager":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only managers can delete reports"
+            )
+        report_query, extra = bulk_selection_query(selection)
+        
+        matched = deleted = 0
+        async with causal_session(current_user.email) as session:
+            for name in report_query.collections():
+                reports = await select_bulk_reports(report_query, extra, name, session)
+                if not reports:
+                    continue
+                matched += len(reports)
+                deleted += await delete_reports(db[name], reports, session=session)
+                # Tombstones for delta sync clients
+                await db.work_report_tombstones.bulk_write([
+                    UpdateOne(
+                        {"id": report["id"]},
+                        {
+                            "$set": {"employee_email": report["employee_email"], "date": report["date"]},
+                            "$currentDate": {"deleted_at": True}
+                        },
+                        upsert=True
+                    )
+                    for report in reports
+                ], ordered=False, session=session)
+            remember_write(current_user.email, session)
+        await invalidate_report_caches()
+        
+        return {"message": f"Deleted {deleted} report(s)", "matched": matched, "deleted": deleted}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Bulk delete work reports error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Work report delete service temporarily unavailable"
+        )
+
+@api_router.put("/work-reports/{report_id}")
+async def update_work_report(
+    report_id: str,
+    report_data: WorkReportUpdate,
+    current_user: UserResponse = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    try:
+        # Check if user is manager
+        if current_user.role != "manager":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only managers can edit reports"
+            )
+        
+        async def update():
+            # Update the report, getting the previous tasks back for the revision log
+            update_data = {
+                "tasks": [task.dict() for task in report_data.tasks],
+                "last_modified_by": current_user.email,
+                "revisions_tracked": True
+            }
+            
+            async with causal_session(current_user.email) as session:
+                before = await update_report_fields(report_id, update_data, session=session)
+                if before is None:
+                    if await is_archived_report(report_id):
+                        raise HTTPException(
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail="Archived reports are read-only"
+                        )
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Report not found"
+                    )
+                await record_task_revision(before, update_data["tasks"], current_user.email, session=session)
+                remember_write(current_user.email, session)
+            await invalidate_report_caches()
+            
+            return {"message": "Report updated successfully"}
+        
+        # A retried edit with the same key does not add a second revision
+        return await run_idempotent(
+            f"{current_user.email}|PUT /work-reports/{report_id}", idempotency_key, report_data.dict(exclude_unset=True), update
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Update work report error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Work report update service temporarily unavailable"
+        )
+
+@api_router.delete("/work-reports/{report_id}")
+async def delete_work_report(
+    report_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    try:
+        # Check if user is manager
+        if current_user.role != "manager":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only managers can delete reports"
+            )
+        
+        # Delete the report, from the hot collection or the archive
+        async with causal_session(current_user.email) as session:
+            report = await remove_report(report_id, session=session)
+            if not report:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Report not found"
+                )
+            # Tombstone for delta sync clients
+            await db.work_report_tombstones.update_one(
+                {"id": report_id},
+                {
+                    "$set": {"employee_email": report["employee_email"], "date": report["date"]},
+                    "$currentDate": {"deleted_at": True}
+                },
+                upsert=True,
+                session=session
+            )
+            remember_write(current_user.email, session)
+        await invalidate_report_caches()
+        
+        return {"message": "Report deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Delete work report error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Work report delete service temporarily unavailable"
+        )
+
+CSV_HEADER = "Date,Employee Name,Department,Team,Reporting Manager,Task Details,Status,Submitted At"
+
+def report_csv_lines(report: Dict[str, Any]) -> List[str]:
+    """One CSV line per task of a report"""
+    lines = []
+    for task in report["tasks"]:
+        details = task["details"].replace('"', '""')
+        lines.append(f'"{report["date"]}","{report["employee_name"]}","{report["department"]}","{report["team"]}","{report["reporting_manager"]}","{details}","{task["status"]}","{report["submitted_at"].strftime("%Y-%m-%d %H:%M:%S IST")}"')
+    return lines
+
+@api_router.get("/work-reports/export/csv")
+async def export_csv(
+    current_user: UserResponse = Depends(get_current_user),
+    department: Optional[str] = None,
+    team: Optional[str] = None,
+    manager: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None
+):
+    try:
+        report_query = ReportQuery.for_user(
+            current_user,
+            department=department,
+            team=team,
+            manager=manager,
+            from_date=from_date,
+            to_date=to_date
+        )
+        async with causal_session(current_user.email) as session:
+            reports = await report_query.fetch("export", "export", email=current_user.email, session=session)
+        
+        # Create CSV without pandas - lightweight approach
+        csv_lines = [CSV_HEADER]
+        for report in reports:
+            csv_lines.extend(report_csv_lines(report))
         
         csv_content = "\n".join(csv_lines)
         
@@ -767,16 +3641,761 @@ async def export_csv(
             detail="CSV export service temporarily unavailable"
         )
 
-@api_router.get("/managers")
-async def get_managers():
+@api_router.get("/org-index")
+async def get_org_index(current_user: UserResponse = Depends(get_current_user)):
+    return {
+        "summary": org_index.summary(),
+        "manager_to_team": org_index.manager_to_team,
+        "team_to_department": org_index.team_to_department,
+        "email_to_manager": org_index.email_to_manager,
+        "manager_headcount": org_index.manager_resources,
+        "team_headcount": org_index.team_headcount,
+        "department_headcount": org_index.department_headcount,
+    }
+
+@api_router.post("/org-index/reload")
+async def reload_org_index(
+    rebuild: bool = False,
+    current_user: UserResponse = Depends(get_current_user)
+):
     try:
-        cursor = db.users.find({"role": "manager"})
-        managers = await cursor.to_list(1000)
+        if current_user.role != "manager":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only managers can reload the organization index"
+            )
+        index = await load_org_index(rebuild=rebuild)
+        await invalidate_user_caches()
+        return {"message": "Organization index reloaded", "summary": index.summary()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Org index reload error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Organization index service temporarily unavailable"
+        )
+
+# Export jobs - long exports run in a background task that streams the cursor
+# into a gzip file in GridFS, so no request waits on the whole export.
+# Jobs are deduplicated by (user scope, filters) while they are active.
+EXPORT_JOB_TTL_MINUTES = int(os.environ.get("EXPORT_JOB_TTL_MINUTES", "15"))
+EXPORT_JOB_STALE_SECONDS = 60
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 256 * 1024
+
+def export_bucket():
+    return AsyncIOMotorGridFSBucket(db, bucket_name="exports")
+
+def export_job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    total = job.get("total_reports") or 0
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "filters": job["filters"],
+        "reports_processed": job.get("reports_processed", 0),
+        "total_reports": total,
+        "rows_written": job.get("rows_written", 0),
+        "progress": round(job.get("reports_processed", 0) / total, 3) if total else (1.0 if job["status"] == "completed" else 0.0),
+        "size": job.get("size"),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "completed_at": job.get("completed_at"),
+        "download_url": f"/api/work-reports/export/jobs/{job['id']}/download" if job["status"] == "completed" else None,
+    }
+
+async def purge_expired_export_jobs():
+    # Queued and running jobs are never purged - expiry starts once a job finishes
+    now = datetime.now(IST)
+    expired = await db.export_jobs.find(
+        {"expires_at": {"$lt": now}, "status": {"$nin": ["queued", "running"]}},
+        {"id": 1, "file_id": 1}
+    ).to_list(100)
+    for job in expired:
+        if job.get("file_id") is not None:
+            try:
+                await export_bucket().delete(job["file_id"])
+            except Exception:
+                pass
+        await db.export_jobs.delete_one({"id": job["id"]})
+
+async def run_export_job(job_id: str):
+    """Claim a queued (or abandoned) job and stream its reports into a gzip CSV in GridFS"""
+    stale_before = datetime.now(IST) - timedelta(seconds=EXPORT_JOB_STALE_SECONDS)
+    job = await db.export_jobs.find_one_and_update(
+        {"id": job_id, "$or": [
+            {"status": "queued"},
+            {"status": "running", "heartbeat_at": {"$lt": stale_before}},
+        ]},
+        {"$set": {"status": "running", "heartbeat_at": datetime.now(IST), "reports_processed": 0, "rows_written": 0}},
+        return_document=ReturnDocument.AFTER
+    )
+    if job is None:
+        return
+    
+    try:
+        report_query = ReportQuery.from_filters(job["scope"], job["filters"])
+        total = await report_query.count("export")
+        await db.export_jobs.update_one({"id": job_id}, {"$set": {"total_reports": total}})
+        
+        grid_in = export_bucket().open_upload_stream(
+            f"work_reports_{job_id}.csv.gz",
+            metadata={"job_id": job_id, "content_type": "application/gzip"}
+        )
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+        buffer = [compressor.compress((CSV_HEADER + "\n").encode())]
+        buffered = 0
+        processed = rows = 0
         
-        # Convert MongoDB documents to dict with proper ObjectId handling
-        managers_list = [convert_mongo_doc(manager) for manager in managers]
+        async for report in report_query.stream("export", "export", batch_size=EXPORT_BATCH_SIZE):
+            lines = report_csv_lines(report)
+            chunk = compressor.compress(("\n".join(lines) + "\n").encode()) if lines else b""
+            if chunk:
+                buffer.append(chunk)
+                buffered += len(chunk)
+            processed += 1
+            rows += len(lines)
+            if buffered >= EXPORT_CHUNK_SIZE:
+                await grid_in.write(b"".join(buffer))
+                buffer, buffered = [], 0
+            if processed % EXPORT_BATCH_SIZE == 0:
+                await db.export_jobs.update_one(
+                    {"id": job_id},
+                    {"$set": {"reports_processed": processed, "rows_written": rows, "heartbeat_at": datetime.now(IST)}}
+                )
         
-        return {"managers": [{"name": manager["name"], "email": manager["email"]} for manager in managers_list]}
+        buffer.append(compressor.flush())
+        await grid_in.write(b"".join(buffer))
+        await grid_in.close()
+        
+        finished_at = datetime.now(IST)
+        await db.export_jobs.update_one(
+            {"id": job_id},
+            {"$set": {
+                "status": "completed",
+                "reports_processed": processed,
+                "rows_written": rows,
+                "file_id": grid_in._id,
+                "size": grid_in.length,
+                "completed_at": finished_at,
+                "expires_at": finished_at + timedelta(minutes=EXPORT_JOB_TTL_MINUTES),
+            }}
+        )
+    except Exception as e:
+        logging.error(f"Export job {job_id} error: {str(e)}")
+        await db.export_jobs.update_one(
+            {"id": job_id},
+            {"$set": {
+                "status": "failed",
+                "active": False,
+                "error": str(e),
+                "expires_at": datetime.now(IST) + timedelta(minutes=EXPORT_JOB_TTL_MINUTES),
+            }}
+        )
+
+# Strong references so running jobs are not garbage collected
+_export_tasks: set = set()
+
+def start_export_worker(job_id: str):
+    # A fresh context, so the job outlives the polling request's query deadline
+    # and its timeouts are not charged to that request's budget
+    task = Context().run(asyncio.create_task, run_export_job(job_id))
+    _export_tasks.add(task)
+    task.add_done_callback(_export_tasks.discard)
+
+async def get_export_job_for_user(job_id: str, current_user: UserResponse) -> Dict[str, Any]:
+    job = await db.export_jobs.find_one({"id": job_id})
+    if not job or job["scope"] != ReportQuery.scope_for(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    return job
+
+@api_router.post("/work-reports/export/jobs")
+async def create_export_job(
+    current_user: UserResponse = Depends(get_current_user),
+    department: Optional[str] = None,
+    team: Optional[str] = None,
+    manager: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None
+):
+    try:
+        await purge_expired_export_jobs()
+        
+        report_query = ReportQuery.for_user(
+            current_user,
+            department=department,
+            team=team,
+            manager=manager,
+            from_date=from_date,
+            to_date=to_date
+        )
+        dedupe_key = hashlib.sha256(report_query.cache_key("export").encode()).hexdigest()
+        now = datetime.now(IST)
+        
+        # Upsert against the partial unique index - concurrent clicks get one job
+        job = None
+        for attempt in range(3):
+            try:
+                job = await db.export_jobs.find_one_and_update(
+                    {"dedupe_key": dedupe_key, "active": True},
+                    {"$setOnInsert": {
+                        "id": str(uuid.uuid4()),
+                        "scope": report_query.scope,
+                        "filters": report_query.filters(),
+                        "status": "queued",
+                        "requested_by": current_user.email,
+                        "created_at": now,
+                    }},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                break
+            except DuplicateKeyError:
+                # A concurrent click inserted the job first; the server does not retry
+                # the upsert itself since "active" is not in the index key - join that job
+                job = await db.export_jobs.find_one({"dedupe_key": dedupe_key, "active": True})
+                if job is not None:
+                    break
+        if job is None:
+            raise RuntimeError(f"Could not create export job for {dedupe_key}")
+        if job["status"] in ("queued", "running"):
+            start_export_worker(job["id"])
+        return export_job_response(job)
+    except Exception as e:
+        logging.error(f"Create export job error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Export job service temporarily unavailable"
+        )
+
+@api_router.get("/work-reports/export/jobs/{job_id}")
+async def get_export_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    try:
+        job = await get_export_job_for_user(job_id, current_user)
+        # Resume jobs whose worker died with its instance
+        if job["status"] in ("queued", "running"):
+            start_export_worker(job_id)
+        return export_job_response(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Get export job error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Export job service temporarily unavailable"
+        )
+
+def parse_range_header(range_header: str, size: int) -> Optional[tuple]:
+    """Parse a single 'bytes=start-end' range, returning inclusive (start, end) or None if unsatisfiable"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text == "":
+            length = int(end_text)
+            if length <= 0:
+                return None
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+@api_router.get("/work-reports/export/jobs/{job_id}/download")
+async def download_export_job(
+    job_id: str,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    try:
+        job = await get_export_job_for_user(job_id, current_user)
+        if job["status"] != "completed":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Export job is {job['status']}"
+            )
+        
+        size = job["size"]
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": "attachment; filename=work_reports.csv.gz",
+        }
+        start, end = 0, size - 1
+        status_code = status.HTTP_200_OK
+        range_header = request.headers.get("range")
+        if range_header:
+            byte_range = parse_range_header(range_header, size)
+            if byte_range is None:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": f"bytes */{size}"}
+                )
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        
+        grid_out = await export_bucket().open_download_stream(job["file_id"])
+        grid_out.seek(start)
+        
+        async def file_chunks():
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await grid_out.read(min(EXPORT_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        
+        return StreamingResponse(
+            file_chunks(),
+            status_code=status_code,
+            media_type="application/gzip",
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Export download error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Export download service temporarily unavailable"
+        )
+
+# Format-aware export - rows are one task each, built in record batches from the cursor
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "work_reports.csv"),
+    "ndjson": ("application/x-ndjson", "work_reports.ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "work_reports.parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "work_reports.arrow"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "work_reports.xlsx"),
+}
+EXPORT_RECORD_BATCH_ROWS = 5000
+EXPORT_COLUMNS = ["date", "employee_name", "employee_email", "department", "team",
+                  "reporting_manager", "task_details", "status", "submitted_at"]
+# Low-cardinality columns are dictionary-encoded in the columnar formats
+EXPORT_DICTIONARY_COLUMNS = {"department", "team", "reporting_manager", "status"}
+
+def report_task_rows(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a report into one row per task"""
+    return [{
+        "date": report["date"],
+        "employee_name": report["employee_name"],
+        "employee_email": report["employee_email"],
+        "department": report["department"],
+        "team": report["team"],
+        "reporting_manager": report["reporting_manager"],
+        "task_details": task["details"],
+        "status": task["status"],
+        "submitted_at": report["submitted_at"].replace(tzinfo=timezone.utc) if report["submitted_at"].tzinfo is None else report["submitted_at"],
+    } for task in report["tasks"]]
+
+def export_arrow_schema():
+    fields = []
+    for column in EXPORT_COLUMNS:
+        if column == "submitted_at":
+            fields.append(pa.field(column, pa.timestamp("ms", tz="UTC")))
+        elif column in EXPORT_DICTIONARY_COLUMNS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+def rows_to_record_batch(rows: List[Dict[str, Any]], schema):
+    arrays = []
+    for field in schema:
+        values = [row[field.name] for row in rows]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a streaming generator"""
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def export_row_batches(cursor, batch_rows: int = EXPORT_RECORD_BATCH_ROWS):
+    """Yield lists of task rows of at most batch_rows rows from a report cursor"""
+    rows = []
+    async for report in cursor:
+        rows.extend(report_task_rows(report))
+        if len(rows) >= batch_rows:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+# Streaming XLSX - the workbook is a zip written entry by entry into _ChunkSink,
+# so rows go from the cursor to the client with no temp files and memory stays
+# at one record batch plus the deflate window. Cells use inline strings rather
+# than a shared string table, which would have to be held until the end.
+# Dates and submission times are Excel serial numbers in IST.
+XLSX_SHEET_LAYOUTS = ("single", "department")
+XLSX_MAX_ROWS = 1048576  # Excel's row limit, header included - larger sheets continue on another
+XLSX_MAX_SHEET_BYTES = 2**32 - 2**26  # stay under the plain zip entry limit, so no reader needs Zip64 entries
+XLSX_COMPRESS_LEVEL = 3
+XLSX_EPOCH_ORDINAL = datetime(1899, 12, 30).toordinal()
+# Day zero at midnight IST - India has kept one fixed offset since 1945, so the
+# serial of an aware timestamp is one subtraction, no per-row zone conversion
+XLSX_IST_EPOCH = datetime(1899, 12, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+XLSX_HEADERS = ["Date", "Employee Name", "Employee Email", "Department", "Team",
+                "Reporting Manager", "Task Details", "Status", "Submitted At (IST)"]
+XLSX_COLUMN_WIDTHS = [12, 24, 32, 18, 18, 24, 60, 14, 20]
+XLSX_LAST_COLUMN = chr(ord("A") + len(XLSX_HEADERS) - 1)
+XLSX_ILLEGAL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+XLSX_SPECIAL_CHARACTERS = re.compile(r"[&<>\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+XLSX_SHEET_TITLE_CHARACTERS = re.compile(r"[\[\]:*?/\\]")
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    # Every other part is a worksheet, so the sheet count need not be known up front
+    '<Default Extension="xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+# Cell styles: 0 general, 1 date, 2 date and time, 3 bold header
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/><numFmt numFmtId="165" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    '<cols>' + "".join(f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>' for i, width in enumerate(XLSX_COLUMN_WIDTHS, 1)) + '</cols>'
+    '<sheetData>'
+    '<row>' + "".join(f'<c t="inlineStr" s="3"><is><t>{header}</t></is></c>' for header in XLSX_HEADERS) + '</row>'
+)
+
+def xlsx_text(value: str) -> str:
+    if XLSX_SPECIAL_CHARACTERS.search(value):
+        value = xml_escape(XLSX_ILLEGAL_CHARACTERS.sub("", value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>'
+
+# Names, teams and dates repeat on almost every row, so their cells are built once
+xlsx_label = lru_cache(maxsize=4096)(xlsx_text)
+
+@lru_cache(maxsize=4096)
+def xlsx_date(value: str) -> str:
+    try:
+        return f'<c s="1"><v>{datetime.fromisoformat(value).toordinal() - XLSX_EPOCH_ORDINAL}</v></c>'
+    except ValueError:
+        return xlsx_text(value)
+
+def xlsx_timestamp(value: datetime) -> str:
+    return f'<c s="2"><v>{(value - XLSX_IST_EPOCH).total_seconds() / 86400:.8f}</v></c>'
+
+def xlsx_row(row: Dict[str, Any]) -> str:
+    return (
+        f'<row>{xlsx_date(row["date"])}{xlsx_label(row["employee_name"] or "")}{xlsx_label(row["employee_email"] or "")}'
+        f'{xlsx_label(row["department"] or "")}{xlsx_label(row["team"] or "")}{xlsx_label(row["reporting_manager"] or "")}'
+        f'{xlsx_text(row["task_details"] or "")}{xlsx_label(row["status"] or "")}{xlsx_timestamp(row["submitted_at"])}</row>'
+    )
+
+class XlsxWorkbook:
+    """Write-only workbook that streams sheets, one at a time, into a non-seekable sink"""
+    def __init__(self, sink):
+        self.zip = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED, compresslevel=XLSX_COMPRESS_LEVEL)
+        self.zip.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        self.zip.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        self.zip.writestr("xl/styles.xml", XLSX_STYLES)
+        self.sheets: List[tuple] = []  # (title, rows) of finished sheets
+        self._entry = None
+        self._title = ""
+        self._rows = 0
+        self._bytes = 0
+
+    def _unique_title(self, title: str) -> str:
+        title = XLSX_SHEET_TITLE_CHARACTERS.sub(" ", title).strip("' ")[:31] or "Sheet"
+        taken = {name.lower() for name, _ in self.sheets}
+        candidate, n = title, 1
+        while candidate.lower() in taken:
+            n += 1
+            suffix = f" ({n})"
+            candidate = title[:31 - len(suffix)] + suffix
+        return candidate
+
+    @property
+    def in_sheet(self) -> bool:
+        return self._entry is not None
+
+    def _write(self, data: str):
+        encoded = data.encode()
+        self._entry.write(encoded)
+        self._bytes += len(encoded)
+
+    def begin_sheet(self, title: str):
+        self.end_sheet()
+        self._title = self._unique_title(title)
+        self._entry = self.zip.open(f"xl/worksheets/sheet{len(self.sheets) + 1}.xml", "w")
+        self._rows = 1
+        self._bytes = 0
+        self._write(XLSX_SHEET_START)
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        """Append rows, continuing on a new sheet of the same title when this one is full"""
+        title = self._title
+        while rows:
+            if self._rows >= XLSX_MAX_ROWS or self._bytes >= XLSX_MAX_SHEET_BYTES:
+                self.begin_sheet(title)
+            fits = XLSX_MAX_ROWS - self._rows
+            self._write("".join(map(xlsx_row, rows[:fits])))
+            self._rows += min(fits, len(rows))
+            rows = rows[fits:]
+
+    def end_sheet(self):
+        if self._entry is None:
+            return
+        self._write(f'</sheetData><autoFilter ref="A1:{XLSX_LAST_COLUMN}{self._rows}"/></worksheet>')
+        self._entry.close()
+        self._entry = None
+        self.sheets.append((self._title, self._rows))
+
+    def close(self):
+        self.end_sheet()
+        if not self.sheets:
+            self.begin_sheet("Work Reports")
+            self.end_sheet()
+        sheets = "".join(
+            f'<sheet name="{xml_escape(title, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, (title, _) in enumerate(self.sheets, 1)
+        )
+        # Excel keeps each sheet's filter range in a hidden defined name
+        filters = "".join(
+            f'<definedName name="_xlnm._FilterDatabase" localSheetId="{i}" hidden="1">'
+            f"'{xml_escape(title.replace(chr(39), chr(39) * 2))}'!$A$1:${XLSX_LAST_COLUMN}${rows}</definedName>"
+            for i, (title, rows) in enumerate(self.sheets)
+        )
+        self.zip.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets><definedNames>{filters}</definedNames></workbook>'
+        ))
+        relationships = "".join(
+            f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self.sheets) + 1)
+        )
+        self.zip.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relationships}'
+            f'<Relationship Id="rId{len(self.sheets) + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        self.zip.close()
+
+async def stream_xlsx(sheets):
+    """Workbook bytes for (title, report stream) pairs; sheets without reports are left out"""
+    sink = _ChunkSink()
+    workbook = XlsxWorkbook(sink)
+    async for title, reports in sheets:
+        async for rows in export_row_batches(reports):
+            if not workbook.in_sheet:
+                workbook.begin_sheet(title)
+            workbook.write_rows(rows)
+            yield sink.drain()
+        workbook.end_sheet()
+    workbook.close()
+    yield sink.drain()
+
+async def xlsx_sheets(report_query: ReportQuery, layout: str, email: str, session):
+    """Report streams per sheet - the whole query, or one query per department"""
+    def stream(query: ReportQuery, extra: Optional[Dict[str, Any]] = None):
+        return query.stream("export", "export", email=email, session=session, batch_size=EXPORT_BATCH_SIZE, extra=extra)
+    
+    if layout == "single":
+        yield "Work Reports", stream(report_query)
+        return
+    departments = [report_query.department] if report_query.department else sorted(org_index.departments)
+    for department in departments:
+        yield department, stream(ReportQuery.from_filters(report_query.scope, {**report_query.filters(), "department": department}))
+    if not report_query.department:
+        # Reports filed under a department the org index does not know
+        yield "Other", stream(report_query, {"department": {"$nin": departments}})
+
+async def stream_export(cursor, export_format: str):
+    if export_format == "csv":
+        yield (CSV_HEADER + "\n").encode()
+        async for report in cursor:
+            lines = report_csv_lines(report)
+            if lines:
+                yield ("\n".join(lines) + "\n").encode()
+    elif export_format == "ndjson":
+        async for rows in export_row_batches(cursor):
+            yield "".join(json.dumps({**row, "submitted_at": row["submitted_at"].isoformat()}) + "\n" for row in rows).encode()
+    else:
+        schema = export_arrow_schema()
+        sink = _ChunkSink()
+        if export_format == "parquet":
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        async for rows in export_row_batches(cursor):
+            batch = rows_to_record_batch(rows, schema)
+            if export_format == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+@api_router.get("/work-reports/export")
+async def export_work_reports(
+    current_user: UserResponse = Depends(get_current_user),
+    format: str = "csv",
+    department: Optional[str] = None,
+    team: Optional[str] = None,
+    manager: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    sheets: str = "single"
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if format in ("parquet", "arrow") and pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{format} export requires pyarrow on the server"
+        )
+    if sheets not in XLSX_SHEET_LAYOUTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sheets must be one of: {', '.join(XLSX_SHEET_LAYOUTS)}"
+        )
+    
+    try:
+        report_query = ReportQuery.for_user(
+            current_user,
+            department=department,
+            team=team,
+            manager=manager,
+            from_date=from_date,
+            to_date=to_date
+        )
+        
+        async def body():
+            async with causal_session(current_user.email) as session:
+                if format == "xlsx":
+                    chunks = stream_xlsx(xlsx_sheets(report_query, sheets, current_user.email, session))
+                else:
+                    cursor = report_query.stream("export", "export", email=current_user.email, session=session, batch_size=EXPORT_BATCH_SIZE)
+                    chunks = stream_export(cursor, format)
+                async for chunk in chunks:
+                    yield chunk
+        
+        media_type, filename = EXPORT_FORMATS[format]
+        return StreamingResponse(
+            body(),
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+    except Exception as e:
+        logging.error(f"Export error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Export service temporarily unavailable"
+        )
+
+@api_router.get("/metrics/query-coalescing")
+async def get_query_coalescing_metrics(current_user: UserResponse = Depends(get_current_user)):
+    return {
+        "work_reports": report_list_queries.snapshot(),
+        "attendance": attendance_queries.snapshot(),
+        "managers": manager_directories.snapshot(),
+        "users": user_lookups.snapshot(),
+        "idempotency": idempotent_requests.snapshot(),
+        "shared_cache": {
+            "enabled": shared_cache is not None,
+            "versions": cache_versions.snapshot(),
+            **(shared_cache.snapshot() if shared_cache is not None else {}),
+        },
+    }
+
+@api_router.get("/metrics/load-shedding")
+async def get_load_shedding_metrics(current_user: UserResponse = Depends(get_current_user)):
+    return load_shedder.snapshot()
+
+@api_router.get("/metrics/query-budgets")
+async def get_query_budget_metrics(current_user: UserResponse = Depends(get_current_user)):
+    return query_budget_monitor.snapshot()
+
+@api_router.get("/managers")
+async def get_managers(request: Request, group_by: Optional[str] = None):
+    try:
+        if group_by is not None and group_by not in MANAGER_GROUPINGS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"group_by must be one of: {', '.join(MANAGER_GROUPINGS)}"
+            )
+        # Each grouping is serialized once per directory build and served with an ETag
+        directory = await manager_directory()
+        payload = directory[group_by or "flat"]
+        return reference_response(request, f"managers:{group_by or 'flat'}", payload, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get managers error: {str(e)}")
         raise HTTPException(
@@ -784,6 +4403,87 @@ async def get_managers():
             detail="Managers service temporarily unavailable"
         )
 
+# Request multiplexing - POST /api/batch runs up to BATCH_MAX_REQUESTS GET
+# sub-requests concurrently through the API router in this process and returns
+# every result in one response. The batch is authenticated once and sub-requests
+# reuse that user instead of verifying the token again. Only interactive reads
+# can be batched: exports would bypass their concurrency limit and have their
+# streamed, often binary, body buffered into the batch response.
+BATCH_MAX_REQUESTS = 20
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+def batch_result(sub: BatchSubRequest, status_code: int, body: Any) -> Dict[str, Any]:
+    return {"id": sub.id, "status": status_code, "body": body}
+
+async def dispatch_subrequest(request: Request, sub: BatchSubRequest, user: UserResponse) -> Dict[str, Any]:
+    """Run one GET sub-request through the API router and capture its response"""
+    if sub.method.upper() != "GET":
+        return batch_result(sub, status.HTTP_405_METHOD_NOT_ALLOWED, {"detail": "Only GET sub-requests are supported"})
+    url = urlsplit(sub.path)
+    if url.scheme or url.netloc or not url.path.startswith("/api/") or url.path == "/api/batch":
+        return batch_result(sub, status.HTTP_400_BAD_REQUEST, {"detail": "Sub-request paths must be /api/ paths"})
+    if load_shedder.classify("GET", url.path) != "interactive":
+        return batch_result(sub, status.HTTP_400_BAD_REQUEST, {"detail": "Only interactive read endpoints can be batched"})
+    if fails_fast(query_budget("GET", url.path)):
+        return batch_result(sub, status.HTTP_503_SERVICE_UNAVAILABLE, {"detail": breaker_open_error().detail})
+    
+    scope = {
+        **{key: value for key, value in request.scope.items() if key not in ("router", "endpoint", "path_params", "route")},
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        # Only the credentials carry over - the batch response is compressed as a whole
+        "headers": [(name, value) for name, value in request.scope["headers"] if name == b"authorization"],
+        "batch_user": user,
+    }
+    started: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+    
+    try:
+        await app.router(scope, receive, send)
+    except StarletteHTTPException as e:
+        return batch_result(sub, e.status_code, {"detail": e.detail})
+    except Exception as e:
+        logging.error(f"Batch sub-request {sub.path} error: {str(e)}")
+        return batch_result(sub, status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": "Sub-request failed"})
+    
+    body = b"".join(chunks)
+    content_type = Headers(raw=started.get("headers", [])).get("content-type", "")
+    if content_type.startswith("application/json") and body:
+        return batch_result(sub, started["status"], json.loads(body))
+    return batch_result(sub, started["status"], body.decode("utf-8", errors="replace"))
+
+@api_router.post("/batch")
+async def batch_requests(
+    batch: BatchRequest,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    if not batch.requests or len(batch.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch holds 1-{BATCH_MAX_REQUESTS} sub-requests"
+        )
+    responses = await asyncio.gather(*[dispatch_subrequest(request, sub, current_user) for sub in batch.requests])
+    return {"responses": responses}
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -0,0 +1,289 @@
+import asyncio
+import os
+import resource
+import sys
+import time
+import jwt
+import json
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import multiprocessing
+from fastapi.security import HTTPAuthorizationCredentials
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Import the backend app module directly - no running server needed for these benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+import server
+
+def time_per_call(func, iterations):
+    """Average wall time of func() in microseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def benchmark_auth(iterations=20000):
+    """Per-request auth overhead: uncached jwt.decode vs the cached verification fast path"""
+    print(f"\n=== Auth overhead per request ({server.ALGORITHM}, {iterations} iterations) ===")
+    user = {
+        "id": "bench-user", "name": "Bench User", "email": "bench@showtimeconsulting.in",
+        "role": "manager", "department": "Data", "team": "Data"
+    }
+    token = server.create_access_token(server.user_token_claims(user))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    uncached = time_per_call(
+        lambda: jwt.decode(token, server.VERIFYING_KEY, algorithms=[server.ALGORITHM]),
+        iterations
+    )
+    server.verify_token(token)
+    cached = time_per_call(lambda: server.verify_token(token), iterations)
+
+    loop = asyncio.new_event_loop()
+    dependency = time_per_call(
+        lambda: loop.run_until_complete(server.get_current_user(credentials)),
+        iterations // 10
+    )
+    loop.close()
+
+    print(f"jwt.decode (uncached):           {uncached:8.1f} µs")
+    print(f"verify_token (cached):           {cached:8.1f} µs")
+    print(f"get_current_user (claims, no DB): {dependency:8.1f} µs")
+    print(f"✅ Cached verification is {uncached / cached:.1f}x faster than decoding")
+
+def sample_reports(count):
+    """Work report documents shaped like get_work_reports output"""
+    departments = list(server.DEPARTMENT_DATA.items())
+    reports = []
+    for i in range(count):
+        department, teams = departments[i % len(departments)]
+        team, managers = next(iter(teams.items()))
+        reports.append({
+            "id": str(uuid.uuid4()),
+            "employee_name": f"Employee {i % 97}",
+            "employee_email": f"employee{i % 97}@showtimeconsulting.in",
+            "department": department,
+            "team": team,
+            "reporting_manager": managers[0],
+            "date": f"2026-10-{i % 28 + 1:02d}",
+            "tasks": [
+                {"id": str(uuid.uuid4()), "details": f"Followed up on item {i}-{t} with the field team and updated the tracker", "status": server.STATUS_OPTIONS[(i + t) % 4]}
+                for t in range(3)
+            ],
+            "submitted_at": datetime(2026, 10, i % 28 + 1, 9, 30),
+            "last_modified_at": datetime(2026, 10, i % 28 + 1, 9, 30),
+            "last_modified_by": "",
+        })
+    return reports
+
+def benchmark_compression(iterations=20):
+    """Bytes on the wire and CPU cost of gzip/Brotli per response size"""
+    print("\n=== Response compression (JSON and CSV) ===")
+    encodings = ["gzip"] + (["br"] if server.brotli is not None else [])
+    print(f"{'payload':<14}{'raw bytes':>12}" + "".join(f"{name + ' bytes':>14}{name + ' ms':>10}" for name in encodings))
+    for count in [5, 50, 500, 5000]:
+        reports = sample_reports(count)
+        payloads = {
+            f"json x{count}": json.dumps({"reports": reports}, default=str).encode(),
+            f"csv x{count}": ("\n".join([server.CSV_HEADER] + [line for r in reports for line in server.report_csv_lines(r)])).encode(),
+        }
+        for label, body in payloads.items():
+            row = f"{label:<14}{len(body):>12}"
+            for encoding in encodings:
+                runs = max(1, iterations if len(body) < 1_000_000 else 3)
+                start = time.perf_counter()
+                for _ in range(runs):
+                    compressed = server.compress_body(body, encoding)
+                elapsed = (time.perf_counter() - start) / runs * 1000
+                row += f"{len(compressed):>14}{elapsed:>10.2f}"
+            print(row)
+    print(f"✅ gzip level {server.GZIP_LEVEL}, Brotli quality {server.BROTLI_QUALITY}")
+
+def with_temporary_database(prefix, run):
+    """Run the coroutine function with server.db bound to a throwaway database on MONGO_URL"""
+    async def wrapper():
+        client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=2000)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            print("⚠️  MongoDB not reachable at MONGO_URL - skipping")
+            return
+        saved = server.db
+        server.db = client[f"{prefix}_benchmark_{uuid.uuid4().hex[:8]}"]
+        try:
+            await run()
+        finally:
+            await client.drop_database(server.db.name)
+            server.db = saved
+            client.close()
+    
+    asyncio.run(wrapper())
+
+def layout_reports(days, employees):
+    """One report per employee per day for the last days, teams spread across departments"""
+    teams = [(department, team) for department, team_map in server.DEPARTMENT_DATA.items() for team in team_map]
+    today = datetime.now(server.IST).replace(tzinfo=None)
+    reports = sample_reports(days * employees)
+    for i, report in enumerate(reports):
+        day = today - timedelta(days=i // employees)
+        department, team = teams[(i % employees) % len(teams)]
+        report.update({
+            "employee_email": f"employee{i % employees}@showtimeconsulting.in",
+            "department": department,
+            "team": team,
+            "date": day.strftime("%Y-%m-%d"),
+            "submitted_at": day,
+            "last_modified_at": day,
+        })
+    return reports, teams
+
+def benchmark_layout(days=60, employees=300, iterations=50):
+    """Team-day and department dashboard latency and index size: per-report documents vs team buckets"""
+    print(f"\n=== Report storage layout ({days} days x {employees} employees) ===")
+    
+    async def run():
+        saved = server.REPORT_STORAGE
+        try:
+            reports, teams = layout_reports(days, employees)
+            server.REPORT_STORAGE = "documents"
+            await server.ensure_indexes()
+            await server.db.work_reports.insert_many(reports)
+            await server.migrate_report_layout("team_buckets")
+            
+            today = reports[0]["date"]
+            week_ago = reports[min(len(reports) - 1, 6 * employees)]["date"]
+            department, team = teams[0]
+            queries = {
+                "team, one day": server.ReportQuery("manager", team=team, from_date=today, to_date=today),
+                "department, 7 days": server.ReportQuery("manager", department=department, from_date=week_ago, to_date=today),
+            }
+            print(f"{'layout':<14}{'query':<22}{'reports':>9}{'avg ms':>9}")
+            for storage in server.REPORT_LAYOUTS:
+                server.REPORT_STORAGE = storage
+                for label, query in queries.items():
+                    found = await query.fetch("analytics")
+                    start = time.perf_counter()
+                    for _ in range(iterations):
+                        await query.fetch("analytics")
+                    elapsed = (time.perf_counter() - start) / iterations * 1000
+                    print(f"{storage:<14}{label:<22}{len(found):>9}{elapsed:>9.2f}")
+            for storage in server.REPORT_LAYOUTS:
+                stats = await server.db.command("collStats", server.report_layout(storage)["hot"])
+                print(f"{storage:<14}documents {stats['count']:>7}   data {stats['size'] / 1024:>9.0f} KiB   indexes {stats['totalIndexSize'] / 1024:>7.0f} KiB")
+        finally:
+            server.REPORT_STORAGE = saved
+    
+    with_temporary_database("layout", run)
+
+def benchmark_signup(signups=500):
+    """Signup write latency: find_one then insert_one vs insert and catch DuplicateKeyError"""
+    print(f"\n=== Signup round trips ({signups} new users, {signups} duplicates) ===")
+    
+    async def check_then_insert(email):
+        if await server.db.users.find_one({"email": email}, {"_id": 1}, collation=server.EMAIL_COLLATION):
+            return False
+        await server.db.users.insert_one({"id": str(uuid.uuid4()), "email": email})
+        return True
+    
+    async def insert_and_catch(email):
+        try:
+            await server.db.users.insert_one({"id": str(uuid.uuid4()), "email": email})
+        except server.DuplicateKeyError:
+            return False
+        return True
+    
+    async def run():
+        await server.ensure_indexes()
+        print(f"{'strategy':<20}{'new ms':>9}{'duplicate ms':>14}")
+        for label, signup in [("find_one + insert", check_then_insert), ("insert + catch", insert_and_catch)]:
+            emails = [f"{label[:4]}{i}@showtimeconsulting.in" for i in range(signups)]
+            timings = []
+            for expected in (True, False):
+                start = time.perf_counter()
+                for email in emails:
+                    assert await signup(email) is expected
+                timings.append((time.perf_counter() - start) / signups * 1000)
+            print(f"{label:<20}{timings[0]:>9.3f}{timings[1]:>14.3f}")
+    
+    with_temporary_database("signup", run)
+
+def benchmark_fields(reports=10000, iterations=10):
+    """Report list latency and payload size: whole reports vs sparse fieldsets"""
+    print(f"\n=== Sparse fieldsets ({reports} reports) ===")
+    fieldsets = {
+        "all fields": None,
+        "calendar": "date",
+        "summary": "date,employee_name,reporting_manager,tasks.status",
+    }
+    
+    async def run():
+        await server.ensure_indexes()
+        # One report per employee per day, as the unique index requires
+        await server.db.work_reports.insert_many(layout_reports(50, reports // 50)[0])
+        print(f"{'fieldset':<14}{'reports':>9}{'avg ms':>9}{'payload KiB':>13}")
+        for label, fields in fieldsets.items():
+            requested = server.parse_fields(fields)
+            query = server.ReportQuery("manager", fields=requested)
+            found = await query.fetch("work_reports", limit=reports)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                found = await query.fetch("work_reports", limit=reports)
+            elapsed = (time.perf_counter() - start) / iterations * 1000
+            body = json.dumps({"reports": [server.trim_report(r, requested) for r in found]}, default=str).encode()
+            print(f"{label:<14}{len(found):>9}{elapsed:>9.2f}{len(body) / 1024:>13.0f}")
+    
+    with_temporary_database("fields", run)
+
+def export_run(export_format, rows):
+    """Stream rows task rows through one export path; returns seconds, bytes, and peak RSS in MiB before and after"""
+    reports = sample_reports(1000)
+    
+    async def cursor():
+        # Report dicts are reused, so only the export path itself holds memory
+        for i in range(-(-rows // 3)):
+            yield reports[i % len(reports)]
+    
+    async def run():
+        if export_format == "xlsx":
+            async def sheets():
+                yield "Work Reports", cursor()
+            chunks = server.stream_xlsx(sheets())
+        else:
+            chunks = server.stream_export(cursor(), export_format)
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+        return size
+    
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    size = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return elapsed, size, baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def benchmark_xlsx(rows=1_000_000):
+    """Export wall time, size and memory: streaming XLSX vs the CSV path"""
+    print(f"\n=== XLSX vs CSV export ({rows} task rows, no database) ===")
+    print(f"{'format':<8}{'rows':>10}{'seconds':>10}{'MiB out':>10}{'RSS before':>12}{'peak RSS':>10}")
+    for count in sorted({rows // 10, rows}):
+        for export_format in ("csv", "xlsx"):
+            # A fresh process per run, so peak RSS belongs to that export alone
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                elapsed, size, before, peak = pool.submit(export_run, export_format, count).result()
+            print(f"{export_format:<8}{count:>10}{elapsed:>10.2f}{size / 2**20:>10.1f}{before:>12.1f}{peak:>10.1f}")
+    print(f"✅ XLSX rows are streamed in batches of {server.EXPORT_RECORD_BATCH_ROWS}, deflate level {server.XLSX_COMPRESS_LEVEL}")
+
+BENCHMARKS = {
+    "auth": benchmark_auth,
+    "compression": benchmark_compression,
+    "layout": benchmark_layout,
+    "signup": benchmark_signup,
+    "fields": benchmark_fields,
+    "xlsx": benchmark_xlsx,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
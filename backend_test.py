@@ -3,9 +3,10 @@ import json
 import time
 from datetime import datetime, timedelta
 import pandas as pd
-from io import StringIO
+from io import StringIO, BytesIO
 import unittest
 import os
+import uuid
 
 # Get the backend URL from the frontend .env file
 with open('/app/frontend/.env', 'r') as f:
@@ -501,6 +502,398 @@ class DailyWorkReportingPortalTest(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         
         print("✅ All existing functionality remains intact")
+    
+    def test_24_export_columnar_formats(self):
+        """Test Parquet and NDJSON exports load without re-parsing strings"""
+        headers = {"Authorization": f"Bearer {self.manager_token}"}
+        
+        response = requests.get(f"{API_URL}/work-reports/export?format=parquet", headers=headers)
+        if response.status_code == 501:
+            print("Parquet export not available on this server (pyarrow missing)")
+        else:
+            self.assertEqual(response.status_code, 200)
+            df = pd.read_parquet(BytesIO(response.content))
+            for col in ["date", "employee_name", "department", "team", "reporting_manager", "task_details", "status", "submitted_at"]:
+                self.assertIn(col, df.columns)
+            self.assertEqual(str(df["status"].dtype), "category")
+        
+        response = requests.get(f"{API_URL}/work-reports/export?format=ndjson", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        for line in response.text.splitlines():
+            self.assertIn("task_details", json.loads(line))
+        
+        response = requests.get(f"{API_URL}/work-reports/export?format=xls", headers=headers)
+        self.assertEqual(response.status_code, 400)
+        
+        print("✅ Columnar export formats working correctly")
+    
+    def test_25_same_day_submission_merges(self):
+        """Test a second submission for the same date merges into one report"""
+        headers = {"Authorization": f"Bearer {self.employee_token}"}
+        report_data = {
+            "employee_name": self.employee_user["name"],
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": "2020-02-29",
+            "tasks": [{"details": "First submission", "status": "WIP"}]
+        }
+        
+        first = requests.post(f"{API_URL}/work-reports", headers=headers, json=report_data).json()
+        report_data["tasks"] = [{"details": "Second submission", "status": "Completed"}]
+        second = requests.post(f"{API_URL}/work-reports", headers=headers, json=report_data).json()
+        self.assertEqual(first["report_id"], second["report_id"])
+        self.assertTrue(second["merged"])
+        
+        response = requests.get(f"{API_URL}/work-reports?from_date=2020-02-29&to_date=2020-02-29", headers=headers)
+        reports = response.json()["reports"]
+        self.assertEqual(len(reports), 1)
+        details = [task["details"] for task in reports[0]["tasks"]]
+        self.assertIn("First submission", details)
+        self.assertIn("Second submission", details)
+        
+        response = requests.get(f"{API_URL}/work-reports/me/history?year=2020", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(29, response.json()["months"]["2020-02"])
+        
+        print("✅ Same-day submissions merge and appear in the history calendar")
+
+    def test_26_report_revision_history(self):
+        """Test manager edits are recorded and earlier versions can be rebuilt"""
+        employee_headers = {"Authorization": f"Bearer {self.employee_token}"}
+        manager_headers = {"Authorization": f"Bearer {self.manager_token}"}
+        report_data = {
+            "employee_name": self.employee_user["name"],
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": f"2019-03-{1 + uuid.uuid4().int % 28:02d}",
+            "tasks": [{"details": "Original task", "status": "WIP"}]
+        }
+        report_id = requests.post(f"{API_URL}/work-reports", headers=employee_headers, json=report_data).json()["report_id"]
+        
+        response = requests.get(f"{API_URL}/work-reports?from_date={report_data['date']}&to_date={report_data['date']}", headers=manager_headers)
+        original_tasks = [r for r in response.json()["reports"] if r["id"] == report_id][0]["tasks"]
+        
+        edited_tasks = [dict(original_tasks[0], status="Completed")]
+        response = requests.put(f"{API_URL}/work-reports/{report_id}", headers=manager_headers, json={"tasks": edited_tasks})
+        self.assertEqual(response.status_code, 200)
+        
+        response = requests.get(f"{API_URL}/work-reports/{report_id}/revisions", headers=manager_headers)
+        self.assertEqual(response.status_code, 200)
+        revisions = response.json()["revisions"]
+        self.assertEqual(revisions[-1]["kind"], "diff")
+        self.assertEqual(revisions[-1]["modified_by"], self.manager_user["email"])
+        
+        response = requests.get(f"{API_URL}/work-reports/{report_id}/revisions/{revisions[-2]['revision']}", headers=manager_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tasks"], original_tasks)
+        
+        response = requests.get(f"{API_URL}/work-reports/{report_id}/revisions", headers=employee_headers)
+        self.assertEqual(response.status_code, 403)
+        
+        print("✅ Report edits are recorded as revisions and earlier versions rebuild")
+
+    def test_27_archived_reports_stay_readable(self):
+        """Test reports past the archive horizon move to the archive and are still served"""
+        employee_headers = {"Authorization": f"Bearer {self.employee_token}"}
+        manager_headers = {"Authorization": f"Bearer {self.manager_token}"}
+        report_date = f"2018-05-{1 + uuid.uuid4().int % 28:02d}"
+        report_data = {
+            "employee_name": self.employee_user["name"],
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": report_date,
+            "tasks": [{"details": "Report old enough to archive", "status": "Completed"}]
+        }
+        report_id = requests.post(f"{API_URL}/work-reports", headers=employee_headers, json=report_data).json()["report_id"]
+        
+        response = requests.post(f"{API_URL}/work-reports/archive", headers=employee_headers)
+        self.assertEqual(response.status_code, 403)
+        response = requests.post(f"{API_URL}/work-reports/archive", headers=manager_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.json()["status"], ["completed", "busy"])
+        
+        response = requests.get(f"{API_URL}/work-reports?from_date={report_date}&to_date={report_date}", headers=manager_headers)
+        self.assertIn(report_id, [report["id"] for report in response.json()["reports"]])
+        
+        response = requests.get(f"{API_URL}/work-reports/me/history?year=2018", headers=employee_headers)
+        self.assertIn(int(report_date[8:]), response.json()["months"]["2018-05"])
+        
+        if requests.post(f"{API_URL}/work-reports/archive", headers=manager_headers).json()["status"] == "completed":
+            response = requests.put(f"{API_URL}/work-reports/{report_id}", headers=manager_headers, json={"tasks": []})
+            self.assertEqual(response.status_code, 409)
+        
+        print("✅ Archived reports are still returned for date ranges that reach them")
+
+    def test_28_liveness_and_readiness(self):
+        """Test the liveness and readiness probes"""
+        response = requests.get(f"{API_URL}/health/live")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "alive")
+        
+        response = requests.get(f"{API_URL}/health/ready")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "ready")
+        self.assertIn("latency_ms", data["database"])
+        self.assertIn("in_use", data["pool"])
+        
+        # Probes inside the cache TTL reuse the same ping
+        checked_at = data["database"]["checked_at"]
+        response = requests.get(f"{API_URL}/health/ready")
+        if response.json()["pid"] == data["pid"]:
+            self.assertEqual(response.json()["database"]["checked_at"], checked_at)
+        
+        print("✅ Liveness and readiness probes respond")
+    
+    def test_29_grouped_managers_with_etag(self):
+        """Test manager directory grouping and conditional requests"""
+        response = requests.get(f"{API_URL}/managers?group_by=department")
+        self.assertEqual(response.status_code, 200)
+        departments = response.json()["departments"]
+        emails = [m["email"] for teams in departments.values() for managers in teams.values() for m in managers]
+        self.assertIn("tejaswini@showtimeconsulting.in", emails)
+        
+        response = requests.get(f"{API_URL}/managers?group_by=team")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(len(response.json()["teams"]) > 0)
+        
+        response = requests.get(f"{API_URL}/managers")
+        etag = response.headers["ETag"]
+        response = requests.get(f"{API_URL}/managers", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        
+        response = requests.get(f"{API_URL}/managers?group_by=email")
+        self.assertEqual(response.status_code, 400)
+        print("✅ Manager directory grouping and ETags working correctly")
+    
+    def test_30_idempotent_report_submission(self):
+        """Test a retried submission with the same Idempotency-Key is applied once"""
+        headers = {"Authorization": f"Bearer {self.employee_token}", "Idempotency-Key": str(uuid.uuid4())}
+        report_data = {
+            "employee_name": self.employee_user["name"],
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": f"2017-05-{1 + uuid.uuid4().int % 28:02d}",
+            "tasks": [{"details": "Submitted over a flaky connection", "status": "WIP"}]
+        }
+        first = requests.post(f"{API_URL}/work-reports", headers=headers, json=report_data)
+        retry = requests.post(f"{API_URL}/work-reports", headers=headers, json=report_data)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers.get("Idempotent-Replayed"), "true")
+        
+        response = requests.get(f"{API_URL}/work-reports?from_date={report_data['date']}&to_date={report_data['date']}", headers=headers)
+        report = [r for r in response.json()["reports"] if r["id"] == first.json()["report_id"]][0]
+        self.assertEqual(len(report["tasks"]), 1)
+        
+        # Reusing the key for a different body is rejected
+        changed = dict(report_data, tasks=[{"details": "Something else", "status": "WIP"}])
+        response = requests.post(f"{API_URL}/work-reports", headers=headers, json=changed)
+        self.assertEqual(response.status_code, 422)
+        print("✅ Idempotency-Key retries replay the first submission")
+    
+    def test_31_bulk_status_update_and_delete(self):
+        """Test managers can change task statuses and delete reports in bulk"""
+        employee_headers = {"Authorization": f"Bearer {self.employee_token}"}
+        manager_headers = {"Authorization": f"Bearer {self.manager_token}"}
+        month = f"2015-{1 + uuid.uuid4().int % 12:02d}"
+        report_ids = []
+        for day in ("01", "02", "03"):
+            report_data = {
+                "employee_name": self.employee_user["name"],
+                "department": "Data",
+                "team": "Data",
+                "reporting_manager": "T. Pardhasaradhi",
+                "date": f"{month}-{day}",
+                "tasks": [
+                    {"details": "Blocked on data access", "status": "Delayed"},
+                    {"details": "Weekly summary", "status": "Completed"}
+                ]
+            }
+            response = requests.post(f"{API_URL}/work-reports", headers=employee_headers, json=report_data)
+            report_ids.append(response.json()["report_id"])
+        
+        update = {"ids": report_ids, "from_status": "Delayed", "to_status": "WIP"}
+        response = requests.patch(f"{API_URL}/work-reports/bulk", headers=employee_headers, json=update)
+        self.assertEqual(response.status_code, 403)
+        
+        response = requests.patch(f"{API_URL}/work-reports/bulk", headers=manager_headers, json=update)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["matched"], 3)
+        self.assertEqual(response.json()["modified"], 3)
+        
+        response = requests.get(f"{API_URL}/work-reports?from_date={month}-01&to_date={month}-03", headers=manager_headers)
+        reports = [r for r in response.json()["reports"] if r["id"] in report_ids]
+        self.assertEqual(len(reports), 3)
+        for report in reports:
+            self.assertEqual([task["status"] for task in report["tasks"]], ["WIP", "Completed"])
+        
+        response = requests.patch(f"{API_URL}/work-reports/bulk", headers=manager_headers, json={"from_status": "Delayed", "to_status": "WIP"})
+        self.assertEqual(response.status_code, 400)
+        
+        response = requests.delete(f"{API_URL}/work-reports/bulk", headers=manager_headers, json={"ids": report_ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["deleted"], 3)
+        print("✅ Bulk status updates and deletes working correctly")
+    
+    def test_32_sparse_fieldsets(self):
+        """Test fields= returns only the requested report fields"""
+        headers = {"Authorization": f"Bearer {self.manager_token}"}
+        response = requests.get(f"{API_URL}/work-reports?fields=date,tasks.status", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        for report in response.json()["reports"]:
+            self.assertTrue(set(report) <= {"id", "date", "tasks"})
+            for task in report.get("tasks", []):
+                self.assertEqual(set(task), {"status"})
+        
+        response = requests.get(f"{API_URL}/work-reports?fields=date,password_hash", headers=headers)
+        self.assertEqual(response.status_code, 400)
+        print("✅ Sparse fieldsets trim report responses")
+    
+    def test_33_batch_requests(self):
+        """Test one batch request returns every dashboard sub-request with its own status"""
+        headers = {"Authorization": f"Bearer {self.manager_token}"}
+        response = requests.post(f"{API_URL}/batch", headers=headers, json={"requests": [
+            {"id": "reports", "path": "/api/work-reports"},
+            {"id": "departments", "path": "/api/departments"},
+            {"id": "status_options", "path": "/api/status-options"},
+            {"id": "manager_resources", "path": "/api/manager-resources"},
+            {"id": "missing", "path": "/api/does-not-exist"},
+            {"id": "export", "path": "/api/work-reports/export?format=parquet"}
+        ]})
+        self.assertEqual(response.status_code, 200)
+        results = {result["id"]: result for result in response.json()["responses"]}
+        self.assertEqual(results["reports"]["status"], 200)
+        self.assertIn("reports", results["reports"]["body"])
+        self.assertIn("departments", results["departments"]["body"])
+        self.assertIn("status_options", results["status_options"]["body"])
+        self.assertIn("manager_resources", results["manager_resources"]["body"])
+        self.assertEqual(results["missing"]["status"], 404)
+        # Streaming exports keep their own concurrency limit and are not batched
+        self.assertEqual(results["export"]["status"], 400)
+        
+        response = requests.post(f"{API_URL}/batch", json={"requests": [{"path": "/api/departments"}]})
+        self.assertEqual(response.status_code, 403)
+        print("✅ Batch endpoint multiplexes sub-requests")
+
+    def test_34_query_budget_metrics(self):
+        """Test budgeted reads are counted per endpoint alongside the circuit breaker state"""
+        headers = {"Authorization": f"Bearer {self.manager_token}"}
+        before = requests.get(f"{API_URL}/metrics/query-budgets", headers=headers).json()
+
+        self.assertEqual(requests.get(f"{API_URL}/attendance-summary", headers=headers).status_code, 200)
+
+        response = requests.get(f"{API_URL}/metrics/query-budgets", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        metrics = response.json()
+        self.assertEqual(
+            metrics["budgets"]["attendance"]["requests"] - before["budgets"]["attendance"]["requests"], 1
+        )
+        for budget in metrics["budgets"].values():
+            self.assertGreater(budget["budget_ms"], 0)
+            self.assertIn("overruns", budget)
+        self.assertEqual(metrics["breaker"]["state"], "closed")
+
+        response = requests.get(f"{API_URL}/metrics/query-budgets")
+        self.assertEqual(response.status_code, 403)
+        print("✅ Query budget metrics report requests, overruns and breaker state")
+
+    def test_35_export_xlsx(self):
+        """Test XLSX export has typed date columns, as one sheet or one sheet per department"""
+        headers = {"Authorization": f"Bearer {self.manager_token}"}
+
+        response = requests.get(f"{API_URL}/work-reports/export?format=xlsx", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"))
+        sheets = pd.read_excel(BytesIO(response.content), sheet_name=None)
+        self.assertEqual(list(sheets), ["Work Reports"])
+        df = sheets["Work Reports"]
+        self.assertIn("Task Details", df.columns)
+        if len(df):
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["Date"]))
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["Submitted At (IST)"]))
+
+        response = requests.get(f"{API_URL}/work-reports/export?format=xlsx&sheets=department", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        sheets = pd.read_excel(BytesIO(response.content), sheet_name=None)
+        self.assertEqual(sum(len(sheet) for sheet in sheets.values()), len(df))
+        for name, sheet in sheets.items():
+            if len(sheet) and name != "Other":
+                self.assertEqual(set(sheet["Department"]), {name})
+
+        response = requests.get(f"{API_URL}/work-reports/export?format=xlsx&sheets=team", headers=headers)
+        self.assertEqual(response.status_code, 400)
+        print("✅ XLSX export working correctly")
+
+    def test_36_delta_sync_sees_writes_after_token(self):
+        """Test writes landing after a sync token was issued are returned by the next sync"""
+        employee_headers = {"Authorization": f"Bearer {self.employee_token}"}
+        manager_headers = {"Authorization": f"Bearer {self.manager_token}"}
+        response = requests.get(f"{API_URL}/work-reports?fields=date", headers=manager_headers)
+        self.assertEqual(response.status_code, 200)
+        token = response.json()["sync_token"]
+
+        report_data = {
+            "employee_name": self.employee_user["name"],
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": f"2014-03-{1 + uuid.uuid4().int % 28:02d}",
+            "tasks": [{"details": "Written after the token", "status": "WIP"}]
+        }
+        response = requests.post(f"{API_URL}/work-reports", headers=employee_headers, json=report_data)
+        report_id = response.json()["report_id"]
+
+        response = requests.get(f"{API_URL}/work-reports/changes", headers=manager_headers, params={"since": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(report_id, [report["id"] for report in response.json()["changes"]])
+        token = response.json()["next_token"]
+
+        # An edit and then a delete after the follow-up token are picked up too
+        update = {"tasks": [{"details": "Edited after the token", "status": "Completed"}]}
+        requests.put(f"{API_URL}/work-reports/{report_id}", headers=manager_headers, json=update)
+        response = requests.get(f"{API_URL}/work-reports/changes", headers=manager_headers, params={"since": token})
+        changed = [report for report in response.json()["changes"] if report["id"] == report_id]
+        self.assertEqual(changed[0]["tasks"][0]["details"], "Edited after the token")
+        token = response.json()["next_token"]
+
+        requests.delete(f"{API_URL}/work-reports/{report_id}", headers=manager_headers)
+        response = requests.get(f"{API_URL}/work-reports/changes", headers=manager_headers, params={"since": token})
+        self.assertIn(report_id, response.json()["deleted"])
+
+        response = requests.get(f"{API_URL}/work-reports/changes", headers=manager_headers, params={"since": "bogus"})
+        self.assertEqual(response.status_code, 400)
+        print("✅ Delta sync returns writes made after the token was issued")
+
+    def test_37_resubmission_for_archived_date_is_refused(self):
+        """Test an employee cannot add a second report for a day that is already archived"""
+        employee_headers = {"Authorization": f"Bearer {self.employee_token}"}
+        manager_headers = {"Authorization": f"Bearer {self.manager_token}"}
+        report_date = f"2013-09-{1 + uuid.uuid4().int % 28:02d}"
+        report_data = {
+            "employee_name": self.employee_user["name"],
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": report_date,
+            "tasks": [{"details": "Archived before the resubmission", "status": "Completed"}]
+        }
+        report_id = requests.post(f"{API_URL}/work-reports", headers=employee_headers, json=report_data).json()["report_id"]
+        if requests.post(f"{API_URL}/work-reports/archive", headers=manager_headers).json()["status"] != "completed":
+            self.skipTest("Archive job busy in another instance")
+
+        resubmitted = dict(report_data, tasks=[{"details": "Resubmitted for an archived day", "status": "WIP"}])
+        response = requests.post(f"{API_URL}/work-reports", headers=employee_headers, json=resubmitted)
+        self.assertEqual(response.status_code, 409)
+
+        response = requests.get(f"{API_URL}/work-reports?from_date={report_date}&to_date={report_date}", headers=employee_headers)
+        self.assertEqual([report["id"] for report in response.json()["reports"]], [report_id])
+        print("✅ Resubmissions for archived dates are refused")
 
 if __name__ == "__main__":
     print(f"Testing backend API at: {API_URL}")
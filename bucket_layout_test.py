@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+# Import the backend app module directly - the bucket pipeline is checked in
+# process against a small evaluator, so MongoDB is not needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+import server
+
+def values(document, path):
+    """Values at a dotted path, fanning out over arrays like MongoDB does"""
+    found = [document]
+    for part in path.split("."):
+        found = [
+            item.get(part)
+            for value in found
+            for item in (value if isinstance(value, list) else [value])
+            if isinstance(item, dict) and part in item
+        ]
+    return [item for value in found for item in (value if isinstance(value, list) else [value])]
+
+def condition_holds(value, condition):
+    if not isinstance(condition, dict):
+        return value == condition
+    checks = {
+        "$eq": lambda operand: value == operand,
+        "$ne": lambda operand: value != operand,
+        "$in": lambda operand: value in operand,
+        "$nin": lambda operand: value not in operand,
+        "$gt": lambda operand: value > operand,
+        "$gte": lambda operand: value >= operand,
+        "$lt": lambda operand: value < operand,
+        "$lte": lambda operand: value <= operand,
+    }
+    return all(checks[operator](operand) for operator, operand in condition.items())
+
+def matches(document, query):
+    for field, condition in query.items():
+        found = values(document, field)
+        negative = isinstance(condition, dict) and set(condition) & {"$ne", "$nin"}
+        if negative:
+            # A negative condition must hold for every value, as in MongoDB
+            if not all(condition_holds(value, condition) for value in found):
+                return False
+        elif not any(condition_holds(value, condition) for value in found):
+            return False
+    return True
+
+def run_pipeline(buckets, pipeline):
+    documents = buckets
+    for stage in pipeline:
+        if "$match" in stage:
+            documents = [document for document in documents if matches(document, stage["$match"])]
+        elif "$unwind" in stage:
+            field = stage["$unwind"].lstrip("$")
+            documents = [{**document, field: entry} for document in documents for entry in document[field]]
+        elif "$replaceRoot" in stage:
+            field = stage["$replaceRoot"]["newRoot"].lstrip("$")
+            documents = [document[field] for document in documents]
+    return documents
+
+def entry(report_id, department, email="someone@example.com"):
+    return {
+        "id": report_id,
+        "employee_email": email,
+        "department": department,
+        "team": "Platform",
+        "date": "2025-03-10",
+        "reporting_manager": "T. Pardhasaradhi",
+    }
+
+# One team whose members file under different departments on the same day
+MIXED_BUCKET = {
+    "_id": server.bucket_id("Platform", "2025-03-10"),
+    "team": "Platform",
+    "date": "2025-03-10",
+    "entries": [entry("known", "Engineering"), entry("unknown", "Skunkworks", "other@example.com")],
+}
+
+class BucketLayoutTest(unittest.TestCase):
+    def test_01_negative_filter_keeps_mixed_buckets(self):
+        """Test the XLSX "Other" sheet finds reports in a bucket that also holds known departments"""
+        query = server.ReportQuery("manager", from_date="2025-03-01", to_date="2025-03-31")
+        pipeline = query.bucket_pipeline({"department": {"$nin": ["Engineering"]}})
+        reports = run_pipeline([MIXED_BUCKET], pipeline)
+        self.assertEqual([report["id"] for report in reports], ["unknown"])
+
+    def test_02_negative_filter_is_left_to_the_entry_match(self):
+        """Test only conditions some entry of every matching bucket satisfies are pushed down"""
+        query = server.ReportQuery("manager", department="Engineering")
+        bucket_match = query.bucket_pipeline({"employee_email": {"$ne": "someone@example.com"}})[0]["$match"]
+        self.assertEqual(bucket_match, {"entries.department": "Engineering"})
+
+    def test_03_positive_filters_still_narrow_buckets(self):
+        """Test equality and range filters still reach the bucket stage"""
+        query = server.ReportQuery("employee:someone@example.com", team="Platform", from_date="2025-03-01")
+        bucket_match = query.bucket_pipeline()[0]["$match"]
+        self.assertEqual(bucket_match, {
+            "entries.employee_email": "someone@example.com",
+            "team": "Platform",
+            "date": {"$gte": "2025-03-01"},
+        })
+        self.assertEqual([report["id"] for report in run_pipeline([MIXED_BUCKET], query.bucket_pipeline())], ["known"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,139 @@
+import requests
+import threading
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Get the backend URL from the frontend .env file
+with open('/app/frontend/.env', 'r') as f:
+    for line in f:
+        if line.startswith('REACT_APP_BACKEND_URL='):
+            BACKEND_URL = line.strip().split('=')[1].strip('"')
+            break
+
+# API base URL
+API_URL = f"{BACKEND_URL}/api"
+
+class QueryCoalescingTest(unittest.TestCase):
+    """
+    Tests that concurrent identical dashboard queries share one MongoDB call.
+    Assumes a single backend instance, since the coalescing layer is per process.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        response = requests.post(
+            f"{API_URL}/auth/login",
+            json={"email": "tejaswini@showtimeconsulting.in", "password": "Welcome@123"}
+        )
+        cls.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def get_metrics(self):
+        response = requests.get(f"{API_URL}/metrics/query-coalescing", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def fire_simultaneously(self, url, count=100):
+        barrier = threading.Barrier(count)
+
+        def fire():
+            barrier.wait()
+            return requests.get(url, headers=self.headers)
+
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            return list(pool.map(lambda _: fire(), range(count)))
+
+    def test_01_identical_report_queries_share_one_db_call(self):
+        """Test 100 simultaneous identical report list requests make one DB call"""
+        # A manager filter nobody uses yet gives a fresh cache key for this run
+        manager = f"Coalescing Test {uuid.uuid4()}"
+        before = self.get_metrics()["work_reports"]
+
+        responses = self.fire_simultaneously(f"{API_URL}/work-reports?manager={manager}")
+
+        after = self.get_metrics()["work_reports"]
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(len({response.text for response in responses}), 1)
+        self.assertEqual(after["db_calls"] - before["db_calls"], 1)
+        self.assertEqual(
+            (after["coalesced"] - before["coalesced"]) + (after["hits"] - before["hits"]),
+            99
+        )
+        print("✅ 100 identical report queries coalesced into one DB call")
+
+    def test_02_identical_attendance_queries_share_one_db_call(self):
+        """Test 100 simultaneous identical attendance requests make one DB call"""
+        before = self.get_metrics()["attendance"]
+
+        # A date far in the past is not cached by earlier tests
+        day = 1 + uuid.uuid4().int % 28
+        responses = self.fire_simultaneously(f"{API_URL}/attendance-summary?date=1999-02-{day:02d}")
+
+        after = self.get_metrics()["attendance"]
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(after["db_calls"] - before["db_calls"], 1)
+        print("✅ 100 identical attendance queries coalesced into one DB call")
+
+    def test_03_concurrent_retries_with_one_idempotency_key(self):
+        """Test 20 simultaneous submissions sharing an Idempotency-Key apply once"""
+        count = 20
+        headers = {**self.headers, "Idempotency-Key": str(uuid.uuid4())}
+        report_data = {
+            "employee_name": "Coalescing Test",
+            "department": "Data",
+            "team": "Data",
+            "reporting_manager": "T. Pardhasaradhi",
+            "date": f"2016-07-{1 + uuid.uuid4().int % 28:02d}",
+            "tasks": [{"details": "Retried submission", "status": "WIP"}]
+        }
+        barrier = threading.Barrier(count)
+
+        def fire():
+            barrier.wait()
+            return requests.post(f"{API_URL}/work-reports", headers=headers, json=report_data)
+
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            responses = list(pool.map(lambda _: fire(), range(count)))
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(len({response.json()["report_id"] for response in responses}), 1)
+        self.assertTrue(all(response.json()["merged"] is False for response in responses))
+        print("✅ 20 concurrent retries with one Idempotency-Key submitted once")
+
+    def test_04_reads_do_not_bypass_the_cache(self):
+        """Test a user's own reads do not mark them as having a pending write"""
+        manager = f"Coalescing Test {uuid.uuid4()}"
+        before = self.get_metrics()["work_reports"]
+
+        # Only writes carry a read-your-writes token; a poll must stay cacheable
+        first = requests.get(f"{API_URL}/work-reports?manager={manager}", headers=self.headers)
+        second = requests.get(f"{API_URL}/work-reports?manager={manager}", headers=self.headers)
+
+        after = self.get_metrics()["work_reports"]
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(after["db_calls"] - before["db_calls"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        print("✅ Repeated reads by one user are served from the cache")
+
+    def test_05_concurrent_export_job_requests_share_one_job(self):
+        """Test 20 simultaneous export job requests with the same filters get one job"""
+        count = 20
+        # A manager filter nobody uses yet, so no active job exists for it
+        url = f"{API_URL}/work-reports/export/jobs?manager=Coalescing Test {uuid.uuid4()}"
+        barrier = threading.Barrier(count)
+
+        def fire():
+            barrier.wait()
+            return requests.post(url, headers=self.headers)
+
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            responses = list(pool.map(lambda _: fire(), range(count)))
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(len({response.json()["job_id"] for response in responses}), 1)
+        print("✅ 20 concurrent export job requests shared one job")
+
+if __name__ == "__main__":
+    print(f"Testing query coalescing at: {API_URL}")
+    unittest.main(verbosity=2)
@@ -8,6 +8,26 @@ import autoTable from "jspdf-autotable";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Report writes carry one Idempotency-Key across retries, so a retry after a
+// dropped connection or a server error replays the first result instead of
+// submitting the tasks twice
+const sendIdempotent = async (request, attempts = 3) => {
+  const key = window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await request({ 'Idempotency-Key': key });
+    } catch (error) {
+      const retryable = !error.response || error.response.status >= 500;
+      if (!retryable || attempt >= attempts) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** (attempt - 1)));
+    }
+  }
+};
+
 // Theme Context
 const ThemeContext = createContext();
 
@@ -67,6 +87,49 @@ const AuthProvider = ({ children }) => {
     }
   }, [token]);
 
+  // Access tokens are short-lived: on a 401, exchange the refresh token once
+  // (shared by concurrent requests) and replay the failed request
+  useEffect(() => {
+    let refreshPromise = null;
+    const interceptor = axios.interceptors.response.use(
+      (response) => response,
+      async (error) => {
+        const original = error.config;
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (
+          error.response?.status !== 401 ||
+          !original ||
+          original._retried ||
+          !refreshToken ||
+          /\/auth\/(login|signup|refresh)$/.test(original.url || '')
+        ) {
+          return Promise.reject(error);
+        }
+        original._retried = true;
+        try {
+          if (!refreshPromise) {
+            refreshPromise = axios
+              .post(`${API}/auth/refresh`, { refresh_token: refreshToken })
+              .finally(() => { refreshPromise = null; });
+          }
+          const { data } = await refreshPromise;
+          localStorage.setItem('token', data.access_token);
+          localStorage.setItem('refresh_token', data.refresh_token);
+          setToken(data.access_token);
+          original.headers = { ...original.headers, Authorization: `Bearer ${data.access_token}` };
+          return axios(original);
+        } catch (refreshError) {
+          localStorage.removeItem('token');
+          localStorage.removeItem('refresh_token');
+          setToken(null);
+          setUser(null);
+          return Promise.reject(error);
+        }
+      }
+    );
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
+
   const getCurrentUser = async () => {
     try {
       const response = await axios.get(`${API}/auth/me`, {
@@ -84,9 +147,10 @@ const AuthProvider = ({ children }) => {
   const login = async (email, password) => {
     try {
       const response = await axios.post(`${API}/auth/login`, { email, password });
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       setToken(access_token);
       setUser(userData);
       
@@ -109,9 +173,10 @@ const AuthProvider = ({ children }) => {
         department, 
         team 
       });
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       setToken(access_token);
       setUser(userData);
       
@@ -126,6 +191,7 @@ const AuthProvider = ({ children }) => {
 
   const logout = () => {
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     setToken(null);
     setUser(null);
   };
@@ -973,11 +1039,15 @@ const DailyReport = () => {
         tasks: tasks.map(({ id, ...task }) => task)
       };
 
-      await axios.post(`${API}/work-reports`, reportData, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const response = await sendIdempotent((headers) =>
+        axios.post(`${API}/work-reports`, reportData, {
+          headers: { Authorization: `Bearer ${token}`, ...headers }
+        })
+      );
 
-      setMessage('Report submitted successfully!');
+      setMessage(response.data.merged
+        ? 'Tasks added to your report for this date!'
+        : 'Report submitted successfully!');
       // Reset form
       setTasks([{ id: Date.now(), details: '', status: 'WIP' }]);
     } catch (error) {
@@ -1279,14 +1349,67 @@ const TeamReport = () => {
   const [editingReport, setEditingReport] = useState(null);
   const [editTasks, setEditTasks] = useState([]);
   const [statusOptions, setStatusOptions] = useState([]);
+  const [syncToken, setSyncToken] = useState(null);
 
   useEffect(() => {
-    fetchReports();
-    fetchDepartments();
-    fetchStatusOptions();
-    fetchManagerResources();
+    loadDashboard();
   }, [filters]);
 
+  const reportParams = () => {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value && value !== 'All') params.append(key, value);
+    });
+    return params;
+  };
+
+  // Reports and reference data in one round trip; a failed part falls back to its own request
+  const loadDashboard = async () => {
+    setLoading(true);
+    try {
+      const response = await axios.post(`${API}/batch`, {
+        requests: [
+          { id: 'reports', path: `/api/work-reports?${reportParams().toString()}` },
+          { id: 'departments', path: '/api/departments' },
+          { id: 'status_options', path: '/api/status-options' },
+          { id: 'manager_resources', path: '/api/manager-resources' }
+        ]
+      }, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      const results = Object.fromEntries(response.data.responses.map((result) => [result.id, result]));
+      if (results.reports.status === 200) {
+        setReports(results.reports.body.reports);
+        setSyncToken(results.reports.body.sync_token);
+      } else {
+        fetchReports();
+      }
+      if (results.departments.status === 200) {
+        setDepartments(results.departments.body.departments);
+      } else {
+        fetchDepartments();
+      }
+      if (results.status_options.status === 200) {
+        setStatusOptions(results.status_options.body.status_options);
+      } else {
+        fetchStatusOptions();
+      }
+      if (results.manager_resources.status === 200) {
+        setManagerResources(results.manager_resources.body.manager_resources);
+      } else {
+        fetchManagerResources();
+      }
+    } catch (error) {
+      console.error('Error loading dashboard:', error);
+      fetchReports();
+      fetchDepartments();
+      fetchStatusOptions();
+      fetchManagerResources();
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const fetchDepartments = async () => {
     try {
       const response = await axios.get(`${API}/departments`, {
@@ -1334,15 +1457,11 @@ const TeamReport = () => {
   const fetchReports = async () => {
     setLoading(true);
     try {
-      const params = new URLSearchParams();
-      Object.entries(filters).forEach(([key, value]) => {
-        if (value && value !== 'All') params.append(key, value);
-      });
-
-      const response = await axios.get(`${API}/work-reports?${params.toString()}`, {
+      const response = await axios.get(`${API}/work-reports?${reportParams().toString()}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       setReports(response.data.reports);
+      setSyncToken(response.data.sync_token);
     } catch (error) {
       console.error('Error fetching reports:', error);
     } finally {
@@ -1350,6 +1469,42 @@ const TeamReport = () => {
     }
   };
 
+  // Apply only the reports changed or deleted since the last sync to the local list
+  const syncReports = async () => {
+    if (!syncToken) {
+      return fetchReports();
+    }
+    try {
+      const params = reportParams();
+      let since = syncToken;
+      const changed = new Map();
+      const deleted = new Set();
+      while (true) {
+        params.set('since', since);
+        const response = await axios.get(`${API}/work-reports/changes?${params.toString()}`, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        if (response.data.reset) {
+          return fetchReports();
+        }
+        response.data.changes.forEach((report) => changed.set(report.id, report));
+        response.data.deleted.forEach((id) => deleted.add(id));
+        since = response.data.next_token;
+        if (!response.data.has_more) break;
+      }
+      setReports((current) => {
+        const merged = current
+          .filter((report) => !deleted.has(report.id) && !changed.has(report.id))
+          .concat([...changed.values()].filter((report) => !deleted.has(report.id)));
+        return merged.sort((a, b) => new Date(b.submitted_at) - new Date(a.submitted_at));
+      });
+      setSyncToken(since);
+    } catch (error) {
+      console.error('Error syncing reports:', error);
+      fetchReports();
+    }
+  };
+
   const startEditing = (report) => {
     setEditingReport(report.id);
     setEditTasks([...report.tasks]);
@@ -1357,12 +1512,14 @@ const TeamReport = () => {
 
   const saveEdits = async (reportId) => {
     try {
-      await axios.put(`${API}/work-reports/${reportId}`, 
-        { tasks: editTasks },
-        { headers: { Authorization: `Bearer ${token}` } }
+      await sendIdempotent((headers) =>
+        axios.put(`${API}/work-reports/${reportId}`,
+          { tasks: editTasks },
+          { headers: { Authorization: `Bearer ${token}`, ...headers } }
+        )
       );
       setEditingReport(null);
-      fetchReports();
+      syncReports();
     } catch (error) {
       alert('Error updating report. Please try again.');
     }
@@ -1374,7 +1531,7 @@ const TeamReport = () => {
         await axios.delete(`${API}/work-reports/${reportId}`, {
           headers: { Authorization: `Bearer ${token}` }
         });
-        fetchReports();
+        syncReports();
         alert('Report deleted successfully');
       } catch (error) {
         alert('Error deleting report. Please try again.');
@@ -0,0 +1,126 @@
+import requests
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Get the backend URL from the frontend .env file
+with open('/app/frontend/.env', 'r') as f:
+    for line in f:
+        if line.startswith('REACT_APP_BACKEND_URL='):
+            BACKEND_URL = line.strip().split('=')[1].strip('"')
+            break
+
+# API base URL
+API_URL = f"{BACKEND_URL}/api"
+
+# Interactive p99 allowed while exports and logins flood the service
+INTERACTIVE_P99_BUDGET_SECONDS = 1.0
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class LoadSheddingTest(unittest.TestCase):
+    """
+    Load test: interactive requests keep a stable p99 while an export and login
+    storm is shed. Assumes a single backend instance, since limits are per process.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        response = requests.post(
+            f"{API_URL}/auth/login",
+            json={"email": "tejaswini@showtimeconsulting.in", "password": "Welcome@123"}
+        )
+        cls.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def interactive_latencies(self, count=200, concurrency=10):
+        def call(_):
+            start = time.perf_counter()
+            response = requests.get(f"{API_URL}/auth/me", headers=self.headers)
+            return response.status_code, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(call, range(count)))
+        self.assertTrue(all(code == 200 for code, _ in results))
+        return [latency for _, latency in results]
+
+    def test_01_interactive_p99_stable_during_export_storm(self):
+        """Test /api/auth/me p99 stays within budget while exports and logins are shed"""
+        baseline = self.interactive_latencies()
+
+        stop = threading.Event()
+        outcomes = []
+
+        def storm(url, method="get", **kwargs):
+            while not stop.is_set():
+                response = getattr(requests, method)(url, **kwargs)
+                outcomes.append((response.status_code, response.headers.get("Retry-After")))
+
+        storms = [
+            (f"{API_URL}/work-reports/export/csv", "get", {"headers": self.headers})
+        ] * 30 + [
+            (f"{API_URL}/auth/login", "post", {"json": {"email": "tejaswini@showtimeconsulting.in", "password": "Welcome@123"}})
+        ] * 20
+        threads = [threading.Thread(target=storm, args=(url, method), kwargs=kwargs) for url, method, kwargs in storms]
+        for thread in threads:
+            thread.start()
+        try:
+            time.sleep(2)
+            under_load = self.interactive_latencies()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        shed = [retry_after for code, retry_after in outcomes if code == 503]
+        self.assertTrue(all(code in (200, 503) for code, _ in outcomes))
+        self.assertTrue(all(retry_after is not None for retry_after in shed))
+        print(f"Storm requests: {len(outcomes)}, shed with 503: {len(shed)}")
+        print(f"Interactive p50/p99 baseline: {percentile(baseline, 0.5) * 1000:.0f}/{percentile(baseline, 0.99) * 1000:.0f} ms")
+        print(f"Interactive p50/p99 under load: {percentile(under_load, 0.5) * 1000:.0f}/{percentile(under_load, 0.99) * 1000:.0f} ms")
+        self.assertLess(percentile(under_load, 0.99), INTERACTIVE_P99_BUDGET_SECONDS)
+        print("✅ Interactive p99 stayed within budget during the export storm")
+
+    def test_02_load_shedding_state_exposed(self):
+        """Test operators can read limits and live limiter state"""
+        response = requests.get(f"{API_URL}/metrics/load-shedding", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn("interactive_target_ms", data)
+        for route_class in ("interactive", "auth", "export", "maintenance"):
+            self.assertIn(route_class, data["classes"])
+            self.assertIn("limit", data["classes"][route_class])
+            self.assertIn("shed", data["classes"][route_class])
+        print("✅ Load shedding configuration and state exposed")
+
+    def test_03_export_job_polls_not_shed_during_export_storm(self):
+        """Test export job creation and status polls do not compete with streaming exports"""
+        response = requests.post(f"{API_URL}/work-reports/export/jobs", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        job_url = f"{API_URL}/work-reports/export/jobs/{response.json()['job_id']}"
+
+        stop = threading.Event()
+
+        def storm():
+            while not stop.is_set():
+                requests.get(f"{API_URL}/work-reports/export/csv", headers=self.headers)
+
+        threads = [threading.Thread(target=storm) for _ in range(30)]
+        for thread in threads:
+            thread.start()
+        try:
+            time.sleep(1)
+            polls = [requests.get(job_url, headers=self.headers).status_code for _ in range(50)]
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(set(polls), {200})
+        print("✅ Export job status polls were served during the export storm")
+
+if __name__ == "__main__":
+    print(f"Testing load shedding at: {API_URL}")
+    unittest.main(verbosity=2)
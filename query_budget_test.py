@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+from fastapi import HTTPException
+from pymongo.errors import ExecutionTimeout
+
+# Import the backend app module directly - the breaker and the stale fallback
+# are exercised in process, so MongoDB is not needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+import server
+
+COOLDOWN_SECONDS = 0.2
+
+class FailedCommand:
+    """The part of a CommandFailedEvent the budget monitor reads"""
+    failure = {"code": server.MAX_TIME_MS_EXPIRED, "errmsg": "operation exceeded time limit"}
+
+class QueryBudgetTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.saved = server.query_breaker
+        self.breaker = server.CircuitBreaker(threshold=3, cooldown=COOLDOWN_SECONDS)
+        server.query_breaker = self.breaker
+
+    def tearDown(self):
+        server.query_breaker = self.saved
+
+    def time_out(self, budget, count):
+        token = server.current_query_budget.set(budget)
+        try:
+            for _ in range(count):
+                server.query_budget_monitor.failed(FailedCommand())
+        finally:
+            server.current_query_budget.reset(token)
+
+    def test_01_breaker_opens_after_consecutive_timeouts(self):
+        """Test the breaker opens at the threshold and then fails requests fast"""
+        self.time_out("work_reports", 2)
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(server.query_breaker.allow())
+
+        self.time_out("work_reports", 1)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertTrue(server.fails_fast("work_reports"))
+        # Endpoints with a fallback are let through to serve it
+        self.assertFalse(server.fails_fast("attendance"))
+        self.assertGreaterEqual(self.breaker.snapshot()["failed_fast"], 1)
+
+    def test_02_half_open_probe_closes_or_reopens(self):
+        """Test one probe is let through after the cooldown and its outcome decides the state"""
+        self.time_out("work_reports", 3)
+        time.sleep(COOLDOWN_SECONDS)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertFalse(self.breaker.allow())
+
+        # A failed probe reopens the breaker for another cooldown
+        self.time_out("work_reports", 1)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+        time.sleep(COOLDOWN_SECONDS)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.success()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.consecutive_timeouts, 0)
+
+    def test_03_export_timeouts_do_not_open_the_breaker(self):
+        """Test streaming export timeouts are counted but never trip the breaker"""
+        before = server.query_budget_monitor.snapshot()["budgets"]["export"]["overruns"]
+        self.time_out("export", 10)
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(server.query_budget_monitor.snapshot()["budgets"]["export"]["overruns"] - before, 10)
+
+        # Job status polls are ordinary report reads; only streamed bodies get the export budget
+        self.assertEqual(server.query_budget("GET", "/api/work-reports/export"), "export")
+        self.assertEqual(server.query_budget("GET", "/api/work-reports/export/jobs/abc/download"), "export")
+        self.assertEqual(server.query_budget("GET", "/api/work-reports/export/jobs/abc"), "work_reports")
+
+    async def test_04_open_breaker_serves_stale_results(self):
+        """Test a serve_stale cache answers from its last result while the breaker is open"""
+        cache = server.SingleFlight("stale_test", ttl=0.01, serve_stale=True)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return {"attendance": len(calls)}
+
+        self.assertEqual(await cache.do("today", fetch), {"attendance": 1})
+        await asyncio.sleep(0.02)
+        self.time_out("attendance", 3)
+
+        self.assertEqual(await cache.do("today", fetch), {"attendance": 1})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.snapshot()["stale"], 1)
+
+        # Nothing cached to fall back on - the request fails fast with 503
+        with self.assertRaises(HTTPException) as raised:
+            await cache.do("yesterday", fetch)
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertIn("Retry-After", raised.exception.headers)
+
+    async def test_05_timeout_falls_back_to_stale_result(self):
+        """Test a fetch that times out returns the expired result instead of an error"""
+        cache = server.SingleFlight("timeout_test", ttl=0.01, serve_stale=True)
+
+        async def fetch():
+            return "fresh"
+
+        async def slow_fetch():
+            raise ExecutionTimeout("operation exceeded time limit", 50)
+
+        self.assertEqual(await cache.do("managers", fetch), "fresh")
+        await asyncio.sleep(0.02)
+        self.assertEqual(await cache.do("managers", slow_fetch), "fresh")
+        self.assertEqual(cache.snapshot()["stale"], 1)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime
+
+# Import the backend app module directly - the shared tier runs against an
+# embedded Redis-protocol server, so neither Redis nor MongoDB is needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+import server
+
+class FakeRedisServer:
+    """Just enough of the Redis protocol for the shared cache tier: GET, SET with PX, INCRBY"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _read_command(self, reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _serve(self, reader, writer):
+        try:
+            while (args := await self._read_command(reader)) is not None:
+                writer.write(self._execute(args[0].decode().upper(), args[1:]))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _execute(self, command, args):
+        self.commands.append(command)
+        if command == "GET":
+            value = self.data.get(args[0])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "SET":
+            self.data[args[0]] = args[1]
+            return b"+OK\r\n"
+        if command in ("INCR", "INCRBY"):
+            value = int(self.data.get(args[0], b"0")) + int(args[1] if args[1:] else 1)
+            self.data[args[0]] = str(value).encode()
+            return b":%d\r\n" % value
+        if command in ("PING", "CLIENT", "SELECT"):
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+class SharedCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = FakeRedisServer()
+        self.saved = server.shared_cache
+        server.shared_cache = server.RedisCache(await self.redis.start())
+        server.cache_versions = server.CacheVersions()
+
+    async def asyncTearDown(self):
+        await server.shared_cache.close()
+        server.shared_cache = self.saved
+        server.cache_versions = server.CacheVersions()
+        await self.redis.stop()
+
+    async def test_01_values_round_trip(self):
+        """Test documents with datetimes, and cached misses, survive the shared tier"""
+        report = {"id": "r1", "submitted_at": datetime(2026, 10, 19, 9, 30), "tasks": [{"status": "WIP"}]}
+        await server.shared_cache.set("report", report, 60)
+        await server.shared_cache.set("missing", None, 60)
+        self.assertEqual(await server.shared_cache.get("report"), (report,))
+        self.assertEqual(await server.shared_cache.get("missing"), (None,))
+        self.assertIsNone(await server.shared_cache.get("never-set"))
+        print("✅ Shared tier round-trips documents and cached misses")
+
+    async def test_02_cold_instance_reads_shared_results(self):
+        """Test a cold instance is served from Redis instead of calling MongoDB"""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return {"present": 3}
+
+        warm = server.SingleFlight("attendance", ttl=60, collection="work_reports")
+        cold = server.SingleFlight("attendance", ttl=60, collection="work_reports")
+        self.assertEqual(await warm.do("2026-10-19", fetch), {"present": 3})
+        self.assertEqual(await cold.do("2026-10-19", fetch), {"present": 3})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cold.stats["shared_hits"], 1)
+        print("✅ Cold instance served from the shared tier")
+
+    async def test_03_writes_bump_the_version(self):
+        """Test bumping a collection version makes every instance fetch again, without deleting keys"""
+        results = iter([{"present": 3}, {"present": 4}])
+
+        async def fetch():
+            return next(results)
+
+        cache = server.SingleFlight("attendance", ttl=60, collection="work_reports")
+        self.assertEqual(await cache.do("2026-10-19", fetch), {"present": 3})
+        await server.invalidate_report_caches()
+        self.assertEqual(await cache.do("2026-10-19", fetch), {"present": 4})
+        self.assertEqual(int(self.redis.data[b"showtime:version:work_reports"]), 1)
+        self.assertNotIn("DEL", self.redis.commands)
+        self.assertNotIn("SCAN", self.redis.commands)
+
+        # Another instance picks the bump up from Redis once its copy of the version expires
+        other = server.CacheVersions()
+        self.assertEqual(await other.get("work_reports"), 1)
+        print("✅ Writes invalidate by bumping the collection version")
+
+    async def test_04_unreachable_redis_falls_back_to_mongodb(self):
+        """Test a failing shared tier counts as a miss and is backed off"""
+        await self.redis.stop()
+        server.shared_cache = server.RedisCache("redis://127.0.0.1:1/0")
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return {"present": 3}
+
+        cache = server.SingleFlight("attendance", ttl=60, collection="work_reports")
+        self.assertEqual(await cache.do("2026-10-19", fetch), {"present": 3})
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(server.shared_cache.snapshot()["available"])
+        self.redis = FakeRedisServer()
+        await self.redis.start()
+        print("✅ Unreachable Redis falls back to the in-process tier")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
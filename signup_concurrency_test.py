@@ -0,0 +1,79 @@
+import requests
+import threading
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Get the backend URL from the frontend .env file
+with open('/app/frontend/.env', 'r') as f:
+    for line in f:
+        if line.startswith('REACT_APP_BACKEND_URL='):
+            BACKEND_URL = line.strip().split('=')[1].strip('"')
+            break
+
+# API base URL
+API_URL = f"{BACKEND_URL}/api"
+
+class SignupConcurrencyTest(unittest.TestCase):
+    """
+    Tests that the unique email index makes signup exactly-once under concurrency
+    and that emails are matched case-insensitively.
+    """
+
+    def signup(self, email):
+        return requests.post(
+            f"{API_URL}/auth/signup",
+            json={
+                "name": "Concurrent Signup",
+                "email": email,
+                "password": "Welcome@123",
+                "department": "Data",
+                "team": "Data"
+            }
+        )
+
+    def test_01_concurrent_signups_create_one_user(self):
+        """Test 50 simultaneous signups for one email create exactly one account"""
+        count = 50
+        email = f"signup.{uuid.uuid4().hex[:8]}@showtimeconsulting.in"
+        barrier = threading.Barrier(count)
+
+        def fire(index):
+            barrier.wait()
+            # Half the requests differ only in case, which the collation treats as the same email
+            return self.signup(email.upper() if index % 2 else email)
+
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            responses = list(pool.map(fire, range(count)))
+
+        codes = [response.status_code for response in responses]
+        self.assertEqual(codes.count(200), 1, codes)
+        self.assertEqual(codes.count(400), count - 1, codes)
+        self.assertTrue(all(
+            response.json()["detail"] == "Email already registered"
+            for response in responses if response.status_code == 400
+        ))
+        print("✅ 50 concurrent signups produced exactly one account")
+
+    def test_02_login_ignores_email_case(self):
+        """Test login matches the stored email case-insensitively and never returns the hash"""
+        email = f"signup.{uuid.uuid4().hex[:8]}@showtimeconsulting.in"
+        self.assertEqual(self.signup(email).status_code, 200)
+
+        response = requests.post(
+            f"{API_URL}/auth/login",
+            json={"email": email.upper(), "password": "Welcome@123"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user"]["email"], email)
+        self.assertNotIn("password_hash", response.json()["user"])
+
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        me = requests.get(f"{API_URL}/auth/me", headers=headers)
+        self.assertEqual(me.status_code, 200)
+        self.assertNotIn("password_hash", me.json())
+        print("✅ Login is case-insensitive and user lookups omit the password hash")
+
+if __name__ == "__main__":
+    print(f"Testing signup concurrency at: {API_URL}")
+    unittest.main(verbosity=2)